@@ -10,13 +10,24 @@ if TYPE_CHECKING:
     from basilisk.engine import Engine
     from basilisk.entity import Actor, Entity
 
+_OFFWHITE = color.offwhite
+_PURPLE = color.purple
+
 
 class Action:
-    meleed = False
+    __slots__ = ("entity", "meleed")
     
     def __init__(self, entity: Actor) -> None:
-        super().__init__()
         self.entity = entity
+        self.meleed = False
+
+    def __setstate__(self, state):
+        # pickles from before __slots__ hold a plain __dict__; slotted ones hold
+        # (__dict__ or None, slot values), the dict part coming from subclasses like BaseAI
+        if isinstance(state, tuple):
+            state = {**(state[0] or {}), **state[1]}
+        for name, value in state.items():
+            setattr(self, name, value)
 
     @property
     def engine(self) -> Engine:
@@ -38,33 +49,46 @@ class Action:
 class PickupAction(Action):
     """Pickup an item and add it to the inventory, if there is room for it."""
 
+    __slots__ = ("items",)
+
     def __init__(self, entity: Actor, items=None):
         super().__init__(entity)
         self.items = items
 
     @property
     def items_here(self):
-        return [i for i in self.engine.game_map.items if i.xy == self.entity.xy and i not in self.entity.inventory.items]
+        here = self.engine.game_map.item_index.get(self.entity.xy, ())
+        return [i for i in here if i not in self.entity.inventory]
 
     def perform(self) -> None:
-        if len(self.items_here) > 1 and not self.items:
+        engine = self.engine
+        items_here = self.items_here
+        if len(items_here) > 1 and not self.items:
             raise exceptions.UnorderedPickup("unordered item pickup")
 
-        items = self.items if self.items else self.items_here
+        items = self.items if self.items else items_here
+        inventory = self.entity.inventory
+        room = 26 - len(inventory.items)
+        check_word_mode = engine.check_word_mode
+        add_message = engine.message_log.add_lazy
+        add_history = engine.history.append
 
         for item in items:
-            if len(self.engine.player.inventory.items) >= 26:
+            if room <= 0:
                 raise exceptions.Impossible("Inventory full.")
+            room -= 1
 
-            item.parent = self.entity.inventory
-            item.parent.items.append(item)
-            self.engine.check_word_mode()
-            segment = "" if len(item.label) == 1 else " segment"
-            self.engine.message_log.add_message(f"You pick up the ?{segment}.", color.offwhite, item.label, item.color)
-            self.engine.history.append(("pickup item",f"{item.name} ({item.char})",self.engine.turn_count))
+            item.parent = inventory
+            inventory.add(item)
+            check_word_mode()
+            label = item.label
+            add_message("You pick up the ?{0}.", _OFFWHITE, label, item.color, ("" if len(label) == 1 else " segment",))
+            add_history(("pickup item",f"{item.name} ({item.char})",engine.turn_count))
 
 
 class ItemAction(Action):
+    __slots__ = ("item", "target_xy", "_target_item")
+
     def __init__(
         self, entity: Actor, item: Item, target_xy: Optional[Tuple[int, int]] = None, target_item: Optional[Item] = None
     ):
@@ -86,20 +110,27 @@ class ItemAction(Action):
 
     def perform(self) -> None:
         """Invoke the items ability, this action will be given to provide context."""
-        self.engine.message_log.add_message(f"You digest the ? segment.", color.offwhite, self.item.label, self.item.color)
-        self.item.edible.start_activation (self)
-        self.engine.history.append(("digest item",f"{self.item.name} ({self.item.char})",self.engine.turn_count))
+        engine = self.engine
+        item = self.item
+        engine.message_log.add_message(f"You digest the ? segment.", _OFFWHITE, item.label, item.color)
+        item.edible.start_activation (self)
+        engine.history.append(("digest item",f"{item.name} ({item.char})",engine.turn_count))
 
 class ThrowItem(ItemAction):
+    __slots__ = ()
+
     def perform(self, at="actor") -> None:
-        if self.engine.player.is_choking:
+        engine = self.engine
+        player = engine.player
+        item = self.item
+        if player.is_choking:
             raise exceptions.Impossible("Can't spit while choking!")
         target = self.target_actor if at == "actor" else self.target_item
-        at = f" at the {target.name}" if target and target is not self.engine.player else ''        
-        self.engine.message_log.add_message(f"You spit the ? segment{at}.", color.offwhite, self.item.label, self.item.color)
+        at = (" at the ", target.name) if target and target is not player else ('', '')
+        engine.message_log.add_lazy("You spit the ? segment{0}{1}.", _OFFWHITE, item.label, item.color, at)
         
-        self.item.spitable.start_activation(self)
-        self.engine.history.append(("spit item",f"{self.item.name} ({self.item.char})",self.engine.turn_count))
+        item.spitable.start_activation(self)
+        engine.history.append(("spit item",f"{item.name} ({item.char})",engine.turn_count))
 
     @property
     def target_item(self) -> Optional[Item]:
@@ -107,6 +138,8 @@ class ThrowItem(ItemAction):
 
 
 class ActionWithDirection(Action):
+    __slots__ = ("dx", "dy")
+
     def __init__(self, entity: Actor, dx: int, dy: int):
         super().__init__(entity)
 
@@ -135,81 +168,103 @@ class ActionWithDirection(Action):
 
 
 class MeleeAction(ActionWithDirection):
+    __slots__ = ("target",)
+
+    def __init__(self, entity: Actor, dx: int, dy: int, target: Optional[Entity] = None):
+        super().__init__(entity, dx, dy)
+        self.target = target
+
+    def __setstate__(self, state):
+        self.target = None  # older saves predate the passed-through target
+        super().__setstate__(state)
+
     def perform(self) -> None:
-        target = self.blocking_entity
+        target = self.target or self.blocking_entity
         if not target:
             raise exceptions.Impossible("Nothing to attack.")
 
         damage = 1
-        i_tar = target in self.engine.player.inventory.items
-
-        pred = "your ? segment" if i_tar else "?"
-        label = target.char if i_tar else target.name
-        attack_desc = f"{self.entity.name.capitalize()} attacks {pred}!"
-            
-        if damage > 0:
-            t_color = target.color if i_tar else color.offwhite
-            self.engine.message_log.add_message(
-                attack_desc, color.offwhite, label, t_color
-            )
-            target.take_damage(damage)
-            if target is self.engine.player and not target.is_alive:
-                target.cause_of_death = self.entity.name
+        i_tar = target in self.engine.player.inventory
+
+        if i_tar:
+            pred, label, t_color = "your ? segment", target.char, target.color
         else:
-            t_color = target.color if i_tar else color.offwhite
-            self.engine.message_log.add_message(
-                f"{attack_desc} But it does no damage.", color.offwhite, label, t_color
-            )
+            pred, label, t_color = "?", target.name, _OFFWHITE
+
+        self.engine.message_log.add_lazy(
+            "{0!c} attacks {1}!", _OFFWHITE, label, t_color, (self.entity.name, pred)
+        )
+        target.take_damage(damage)
+        if target is self.engine.player and not target.is_alive:
+            target.cause_of_death = self.entity.name
 
 
 class BumpAction(ActionWithDirection):
+    __slots__ = ()
+
     def perform(self) -> None:
-        if self.blocking_entity and self.entity is not self.engine.player:
-            if self.blocking_entity is self.engine.player or self.blocking_entity in self.engine.player.inventory.items:
+        player = self.engine.player
+        if self.entity is not player:
+            blocker = self.blocking_entity
+            if blocker and (blocker is player or blocker in player.inventory):
                 self.meleed = True
-                return MeleeAction(self.entity, self.dx, self.dy).perform()
+                return MeleeAction(self.entity, self.dx, self.dy, blocker).perform()
 
         return MovementAction(self.entity, self.dx, self.dy).perform()
 
 
 class MovementAction(ActionWithDirection):
+    __slots__ = ()
+
     def perform(self) -> None:
-        if self.entity is self.engine.player:
-            if not self.engine.game_map.tile_is_snakeable(*self.dest_xy, any(isinstance(s, Phasing) for s in self.entity.statuses)):
+        entity = self.entity
+        engine = self.engine
+        game_map = engine.game_map
+        dest_xy = self.dest_xy
+
+        if entity is not engine.player:
+            if not game_map.tile_is_walkable(*dest_xy):
                 raise exceptions.Impossible("That way is blocked.")
 
-            self.entity.move(self.dx,self.dy)
+            entity.move(self.dx,self.dy)
+            return
 
-            for enemy in self.entity.get_adjacent_actors():
-                enemy.constrict()
-            if self.target_item:
-                return PickupAction(self.entity).perform()
+        if not game_map.tile_is_snakeable(*dest_xy, Phasing in entity.status_map):
+            raise exceptions.Impossible("That way is blocked.")
 
-        else:
-            if not self.engine.game_map.tile_is_walkable(*self.dest_xy):
-                raise exceptions.Impossible("That way is blocked.")
+        entity.move(self.dx,self.dy)
+        return self.after_player_move()
 
-            self.entity.move(self.dx,self.dy)
+    def after_player_move(self) -> None:
+        """Constrict newly adjacent enemies and pick up whatever is underfoot."""
+        self.entity.constrict_adjacent()
+        if self.target_item:
+            return PickupAction(self.entity).perform()
 
 
 class WaitAction(Action):
+    __slots__ = ()
+
     def perform(self) -> None:
         pass
 
 class TakeStairsAction(Action):
+    __slots__ = ()
+
     def perform(self) -> None:
         """
         Take the stairs, if any exist at the entity's location.
         """
-        
-        if (self.entity.x, self.entity.y) == self.engine.game_map.downstairs_location:
-            if self.engine.difficulty == "normal" and not self.engine.word_mode:
+        engine = self.engine
+
+        if self.entity.xy == engine.game_map.downstairs_location:
+            if engine.difficulty == "normal" and not engine.word_mode:
                 raise exceptions.Impossible("Must be in WORD MODE to use stairs.")
 
-            self.engine.game_world.generate_floor()
-            self.engine.message_log.add_message(
-                "You descend the staircase.", color.purple
+            engine.game_world.generate_floor()
+            engine.message_log.add_message(
+                "You descend the staircase.", _PURPLE
             )
-            self.engine.history.append(("descend stairs",self.engine.game_map.floor_number,self.engine.turn_count))
+            engine.history.append(("descend stairs",engine.game_map.floor_number,engine.turn_count))
         else:
             raise exceptions.Impossible("There are no stairs here.")
@@ -30,11 +30,7 @@ class BaseAI(Action):
 
     @property
     def fov(self):
-        return tcod.map.compute_fov(
-            self.engine.game_map.tiles["transparent"],
-            (self.entity.x, self.entity.y),
-            radius=8,
-        )
+        return self.engine.game_map.compute_fov(self.entity.x, self.entity.y, 8)
 
     def clear_intent(self):
         self._intent = None
@@ -68,14 +64,14 @@ class BaseAI(Action):
         tiles = gm.tiles["walkable"] if walkable else np.full((gm.width,gm.height),fill_value=1,order="F")
         cost = np.array(tiles, dtype=np.int8)
 
-        for entity in gm.entities:
-            # Check that an enitiy blocks movement and the cost isn't zero (blocking.)
-            if entity.blocks_movement and cost[entity.x, entity.y] and (entity.x != dest_x or entity.y != dest_y):
-                # Add to the cost of a blocked position.
-                # A lower number means more enemies will crowd behind each other in
-                # hallways.  A higher number means enemies will take longer paths in
-                # order to surround the player.
-                cost[entity.x, entity.y] += path_cost
+        # Add to the cost of every blocked position the cost isn't zero for,
+        # except the destination.
+        # A lower number means more enemies will crowd behind each other in
+        # hallways.  A higher number means enemies will take longer paths in
+        # order to surround the player.
+        blocked = gm.blocked_mask() & (cost != 0)
+        blocked[dest_x, dest_y] = False
+        cost[blocked] += path_cost
 
         # Create a graph from the cost array and pass that graph to a new pathfinder.
         graph = tcod.path.SimpleGraph(cost=cost, cardinal=3, diagonal=4)
@@ -115,11 +111,7 @@ class HostileEnemy(BaseAI):
         return max(abs(dx),abs(dy))
 
     def pick_target(self):
-        fov = tcod.map.compute_fov(
-            self.engine.game_map.tiles["transparent"],
-            (self.entity.x, self.entity.y),
-            radius=8,
-        )
+        fov = self.engine.game_map.compute_fov(self.entity.x, self.entity.y, 8)
 
         # pick the first thing in fov that you can path to:
             # a decoy
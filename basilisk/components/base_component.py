@@ -9,6 +9,7 @@ if TYPE_CHECKING:
 
 
 class BaseComponent:
+    __slots__ = ()
     parent: Entity  # Owning entity instance.
 
     @property
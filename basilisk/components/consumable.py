@@ -1,8 +1,8 @@
 from __future__ import annotations
 
+from functools import lru_cache
 from typing import Optional, TYPE_CHECKING
 import random
-import math
 import numpy as np
 
 from basilisk import actions, color, exceptions
@@ -28,6 +28,15 @@ if TYPE_CHECKING:
     from basilisk.entity import Actor, Item
 
 
+@lru_cache(maxsize=None)
+def disk_dist2(radius: int) -> np.ndarray:
+    """Squared distance from the centre of a (2r+1)x(2r+1) box, shared per radius."""
+    d = np.arange(-radius, radius+1)
+    dist2 = d[:,None]*d[:,None] + d[None,:]*d[None,:]
+    dist2.flags.writeable = False
+    return dist2
+
+
 class Consumable(BaseComponent):
     parent: Item
     saved_stats=False
@@ -118,7 +127,7 @@ class Consumable(BaseComponent):
 
     def consume(self, force=False) -> None:
         """Remove the consumed item from its containing inventory."""
-        if not self.parent in self.engine.player.inventory.items:
+        if not self.parent in self.engine.player.inventory:
             self.parent.consume()
             return
         self.do_snake = True
@@ -134,14 +143,22 @@ class Consumable(BaseComponent):
             return
         self.engine.player.snake(self.footprint, self.start_at)
 
+    def require_visible_target(self, action, self_target_msg: Optional[str] = None) -> None:
+        """Raise Impossible if the target tile is out of sight, or is the consumer when self_target_msg is given."""
+        x, y = action.target_xy
+        if not self.engine.game_map.visible[x, y]:
+            raise Impossible("You cannot target an area that you cannot see.")
+        if self_target_msg and action.target_actor is action.entity:
+            raise Impossible(self_target_msg)
+
     def apply_status(self, action, status) -> None:
         if action.target_actor.is_boss:
             return
-        st = [s for s in action.target_actor.statuses if isinstance(s,status)]
-        if st:
-            st[0].strengthen(self.MIND)
+        existing = action.target_actor.get_status(status)
+        if existing:
+            existing.strengthen(self.MIND)
         else:
-            st = status(self.MIND, action.target_actor)
+            status(self.MIND, action.target_actor)
 
     def animate_explosion(self,origin,radius,colors):
         self.engine.mouse_location = (0,0)
@@ -152,11 +169,12 @@ class Consumable(BaseComponent):
 
         self.engine.animation_beat(0)
         for r in range(radius+1):
+            r2 = r*r
             i = x-r
             while i <= x+r:
                 j = y-r
                 while j <= y+r:
-                    if math.sqrt((x-i)**2 + (y-j)**2) <= r and self.engine.game_map.visible[i,j] and self.engine.game_map.tile_is_walkable(i,j,entities=False):
+                    if (x-i)**2 + (y-j)**2 <= r2 and self.engine.game_map.visible[i,j] and self.engine.game_map.tile_is_walkable(i,j,entities=False):
                         c = random.choice(colors)
                         console.tiles_rgb["bg"][i,j] = c
                         console.tiles_rgb["fg"][i,j] = color.black
@@ -166,13 +184,25 @@ class Consumable(BaseComponent):
 
     def get_path_to(self, dest_x, dest_y, walkable=True, thru_tail=True):
         """versatile bresenham"""
+        gm = self.gamemap
+        player = self.engine.player
+        key = (gm.version, player.x, player.y, dest_x, dest_y, walkable, thru_tail)
+        path = gm.path_cache.get(key)
+        if path is None:
+            path = self.find_path_to(dest_x, dest_y, walkable, thru_tail)
+            if len(gm.path_cache) >= 64:
+                gm.path_cache.clear()
+            gm.path_cache[key] = path
+        return list(path)
+
+    def find_path_to(self, dest_x, dest_y, walkable=True, thru_tail=True):
         gm = self.gamemap
         tiles = gm.tiles['walkable'] if walkable else np.full((gm.width,gm.height),fill_value=True,order="F")
         tiles = np.array(tiles, dtype=np.bool)
 
         for entity in gm.entities:
             if entity.blocks_movement:
-                if thru_tail and entity in self.engine.player.inventory.items:
+                if thru_tail and entity in self.engine.player.inventory:
                     continue
                 tiles[entity.x,entity.y] = False
 
@@ -254,8 +284,9 @@ class Projectile(Consumable):
 
 
     def consume(self, force=False) -> None:
-        if any(isinstance(s,FreeSpit) for s in self.engine.player.statuses) and not force:
-            [s for s in self.engine.player.statuses if isinstance(s,FreeSpit)][0].decrement(False)
+        free_spit = self.engine.player.get_status(FreeSpit)
+        if free_spit and not force:
+            free_spit.decrement(False)
             return
 
         super().consume()
@@ -377,18 +408,25 @@ class WormholeConsumable(Projectile):
         consumer = action.entity
 
         wormhole = None
-        if not self.parent.identified and not self.engine.game_map.tile_is_walkable(*action.target_xy):
+        gm = self.engine.game_map
+        if not self.parent.identified and not gm.tile_is_walkable(*action.target_xy):
             path = self.get_path_to(*action.target_xy)
 
-            for tile in reversed(path):
-                if not self.engine.game_map.tile_is_walkable(*tile, consumer.is_phasing):
-                    continue
-                wormhole = tile
-                break
+            if path:
+                # one terrain read for the whole path, then check blockers
+                # from the far end until a free tile turns up
+                xs, ys = np.asarray(path).T
+                landable = (xs >= 0) & (xs < gm.width) & (ys >= 0) & (ys < gm.height)
+                if not consumer.is_phasing:
+                    landable[landable] = gm.tiles["walkable"][xs[landable], ys[landable]]
+                for i in np.flatnonzero(landable)[::-1]:
+                    if not gm.get_blocking_entity_at_location(*path[i]):
+                        wormhole = path[i]
+                        break
         elif not self.parent.identified:
             wormhole = action.target_xy
 
-        if self.parent.identified and self.engine.game_map.tile_is_snakeable(*action.target_xy):
+        if self.parent.identified and gm.tile_is_snakeable(*action.target_xy):
             wormhole = action.target_xy
 
         if not wormhole:
@@ -398,8 +436,7 @@ class WormholeConsumable(Projectile):
         self.engine.message_log.add_message("Space stretches like taffy around you!")
         self.engine.player.place(*wormhole)
 
-        for enemy in consumer.get_adjacent_actors():
-            enemy.constrict()
+        consumer.constrict_adjacent()
         if action.target_item:
             actions.PickupAction(consumer).perform()
 
@@ -426,23 +463,27 @@ class EntanglingConsumable(Projectile):
         )
 
     def start_activation(self,action):
-        if not self.engine.game_map.visible[action.target_xy]:
-            raise Impossible("You cannot target an area that you cannot see.")
+        self.require_visible_target(action)
         super().start_activation(action)
 
     def activate(self, action: actions.ItemAction) -> None:
         x,y = action.target_xy
+        gm = self.engine.game_map
+        radius = self.radius
+
+        # clip the swathe's bounding box to the map
+        x0, x1 = max(x-radius, 0), min(x+radius+1, gm.width)
+        y0, y1 = max(y-radius, 0), min(y+radius+1, gm.height)
+        dist2 = disk_dist2(radius)[x0-x+radius:x1-x+radius, y0-y+radius:y1-y+radius]
+
+        tiles = gm.tiles[x0:x1, y0:y1]
+        open_tiles = ~gm.blocked_mask()[x0:x1, y0:y1] & (tiles != tile_types.down_stairs)
 
         self.engine.animation_beat(0)
-        for r in range(self.radius+1):
-            for xi in range(x-r,x+r+1):
-                for yi in range(y-r,y+r+1):
-                    if (
-                        math.sqrt((xi-x) ** 2 + (yi-y) ** 2) <= r and 
-                        self.engine.game_map.tile_is_walkable(xi,yi) and
-                        not self.engine.game_map.tiles[xi,yi] in (tile_types.down_stairs)
-                    ):
-                        self.engine.game_map.tiles[(xi,yi)] = tile_types.snake_only
+        for r in range(radius+1):
+            ring = (dist2 <= r*r) & tiles["walkable"] & open_tiles
+            tiles[ring] = tile_types.snake_only
+            gm.tiles_changed()
             self.engine.animation_beat(0.06)
 
         self.engine.message_log.add_message("The ground turns to snakestone -- only you can traverse it.")
@@ -489,8 +530,7 @@ class SpittingConsumable(Projectile):
 
         self.engine.message_log.add_message("Scratch that. It spits you!")
 
-        for enemy in consumer.get_adjacent_actors():
-            enemy.constrict()
+        consumer.constrict_adjacent()
         if action.target_item:
             actions.PickupAction(consumer).perform()
 
@@ -499,28 +539,34 @@ class VacuumConsumable(Consumable):
     description="swallow all visible items"
 
     def activate(self, action: actions.ItemAction) -> None:
+        engine = self.engine
+        gm = engine.game_map
+        visible = gm.visible
+        inventory = engine.player.inventory
         to_swallow = [
-            i for i in self.engine.game_map.items if 
-                self.engine.game_map.visible[i.x,i.y] and 
-                i not in self.engine.player.inventory.items
+            i for i in gm.items if 
+                visible[i.x,i.y] and 
+                i not in inventory
         ]
 
         if len(to_swallow) < 1:
-            self.engine.message_log.add_message("Your stomach growls.")
+            engine.message_log.add_message("Your stomach growls.")
             return
 
-        self.engine.message_log.add_message("The resulting void attracts all nearby items!")
+        engine.message_log.add_message("The resulting void attracts all nearby items!")
 
         t = 0.12/len(to_swallow)
+        get_path_to = self.get_path_to
         while len(to_swallow):
-            to_swallow = [i for i in to_swallow if i.xy != action.entity.xy]
+            consumer_xy = action.entity.xy
+            to_swallow = [i for i in to_swallow if i.xy != consumer_xy]
             for i in to_swallow:
-                path = self.get_path_to(*i.xy)
+                path = get_path_to(*i.xy)
                 if len(path) > 1:
                     i.place(*path[-2])
                 else:
-                    i.place(*action.entity.xy)
-            self.engine.animation_beat(t)
+                    i.place(*consumer_xy)
+            engine.animation_beat(t)
         
         actions.PickupAction(action.entity).perform()
 
@@ -532,10 +578,12 @@ class VacuumProjectile(Consumable):
         self.do_snake = False
 
     def activate(self, action: actions.ItemAction) -> None:
+        visible = self.engine.game_map.visible
+        inventory = self.engine.player.inventory
         to_destroy = [
             i for i in self.engine.game_map.items if
-            self.engine.game_map.visible[i.x,i.y] and
-            i not in self.engine.player.inventory.items
+            visible[i.x,i.y] and
+            i not in inventory
         ]
 
         if len(to_destroy) < 1:
@@ -572,8 +620,9 @@ class HookshotProjectile(Projectile):
             self.engine.message_log.add_message(f"It pulls the {target.label} back to you!")
             path = self.get_path_to(*action.target_xy)
             pull_to = None
+            tail = {i.xy for i in self.engine.player.inventory.items}
             for tile in reversed(path):
-                if any(i.xy == tile for i in self.engine.player.inventory.items):
+                if tile in tail:
                     break
                 pull_to = tile
             if pull_to:
@@ -581,7 +630,7 @@ class HookshotProjectile(Projectile):
             target.constrict()
             return
 
-        if not target and action.target_item and action.target_item not in consumer.inventory.items:
+        if not target and action.target_item and action.target_item not in consumer.inventory:
             target = action.target_item
             self.engine.message_log.add_message(f"It pulls the {target.label} back to you!")
             tile = consumer.xy
@@ -603,20 +652,23 @@ class KnockbackProjectile(Projectile):
         consumer = action.entity
         target = action.target_actor
 
+        engine = self.engine
+        message_log = engine.message_log
         projectile_path = self.get_path_to(action.target_xy[0],action.target_xy[1])
         push_path = self.get_path_past(target.x,target.y) if target and not target.is_boss else []
         #t = 0.12/(len(projectile_path) + len(push_path))
         t = 0.06
 
-        self.engine.animation_beat(0,render=True)
+        engine.animation_beat(0,render=True)
         for i,tile in enumerate(projectile_path):
             self.animate_projectile_path(t,tile)
 
         if push_path:
             pushed = False
-            destination = None
+            tile_is_walkable = engine.game_map.tile_is_walkable
+            damage = self.modified_damage
             for i,tile in enumerate(push_path):
-                if not self.engine.game_map.tile_is_walkable(*tile) or i+1 > self.modified_damage:
+                if not tile_is_walkable(*tile) or i+1 > damage:
                     break
                 pushed = True
                 target.place(*tile)
@@ -624,12 +676,12 @@ class KnockbackProjectile(Projectile):
                 self.animate_projectile_path(t,tile)
 
             if pushed:
-                self.engine.message_log.add_message(f"The {target.name} is slammed backward.")
+                message_log.add_message(f"The {target.name} is slammed backward.")
 
             else:
-                self.engine.message_log.add_message(f"The {target.name} couldn't be pushed.")
+                message_log.add_message(f"The {target.name} couldn't be pushed.")
         else:
-            self.engine.message_log.add_message("It dissipates in the air.")
+            message_log.add_message("It dissipates in the air.")
 
 
 class KnockbackConsumable(Consumable):
@@ -641,34 +693,37 @@ class KnockbackConsumable(Consumable):
 
     def activate(self, action: actions.ItemAction) -> None:
         consumer=action.entity
-        pushed = self.knockback_from_segment(consumer,consumer)
+        damage = self.modified_damage
+        pushed = self.knockback_from_segment(consumer,consumer,damage)
         for i in consumer.inventory.items:
-            if self.knockback_from_segment(i,consumer):
+            if self.knockback_from_segment(i,consumer,damage):
                 pushed = True
         if not pushed:
             self.engine.message_log.add_message("The dust on the dungeon floor is swept away from you.")
 
-    def knockback_from_segment(self,segment,consumer) -> None:
+    def knockback_from_segment(self,segment,consumer,damage) -> None:
         pushed = False
+        engine = self.engine
+        tile_is_walkable = engine.game_map.tile_is_walkable
         for actor in segment.get_adjacent_actors():
             if actor is consumer or actor.is_boss:
                 continue
-            d = (actor.x-segment.x,actor.y-segment.y)
+            dx, dy = actor.x-segment.x, actor.y-segment.y
+            x, y = actor.xy
             destination = None
 
-            for i in range(self.modified_damage):
-                new_tile = (actor.x+d[0],actor.y+d[1]) if i == 0 else (destination[0]+d[0],destination[1]+d[1])
-                if self.engine.game_map.tile_is_walkable(*new_tile):
-                    destination = new_tile
-                else:
+            for i in range(damage):
+                x, y = x+dx, y+dy
+                if not tile_is_walkable(x, y):
                     break
+                destination = (x, y)
 
             if destination:
                 pushed = True
                 actor.place(*destination)
-                self.engine.message_log.add_message(f"The {actor.name} is slammed backward.")
+                engine.message_log.add_message(f"The {actor.name} is slammed backward.")
 
-        explosion_radius = self.modified_damage if pushed else 1
+        explosion_radius = damage if pushed else 1
         self.animate_explosion(segment.xy,explosion_radius,[color.bile,color.bile,color.bile,color.b_bile])
         return pushed
 
@@ -700,20 +755,39 @@ class DrillingProjectile(Projectile):
         walkable = not self.parent.identified
         path = self.get_path_to(*action.target_xy,walkable=walkable)
         t = 0.12/len(path) if len(path) else 0
-        gm = self.engine.game_map
+        engine = self.engine
+        gm = engine.game_map
+        message_log = engine.message_log
+        damage = self.modified_damage
+        animate_projectile = self.animate_projectile
+
+        # read walkability for the whole path at once; drilling only ever
+        # opens the tile it is on, so the snapshot stays valid
+        if path:
+            xs, ys = np.asarray(path).T
+            walls = ~gm.tiles['walkable'][xs, ys]
+        else:
+            walls = ()
 
-        self.engine.animation_beat(0)
-        for tile in path:
-            self.animate_projectile(t,tile,color.bile)
+        walls_drilled = 0
+        engine.animation_beat(0)
+        for tile, is_wall in zip(path, walls):
+            animate_projectile(t,tile,color.bile)
 
             actor = gm.get_actor_at_location(*tile)
             if actor and actor is not consumer:
-                actor.take_damage(self.modified_damage)
-                self.engine.message_log.add_message(f"It drills through the ?!", color.offwhite, actor.name, actor.color)
+                actor.take_damage(damage)
+                message_log.add_message(f"It drills through the ?!", color.offwhite, actor.name, actor.color)
 
-            if not gm.tiles['walkable'][tile[0],tile[1]]:
+            if is_wall:
                 gm.tiles[tile[0],tile[1]] = tile_types.floor
-                self.engine.message_log.add_message("It drills through the dungeon wall!", color.offwhite)
+                gm.tiles_changed()
+                walls_drilled += 1
+
+        if walls_drilled == 1:
+            message_log.add_message("It drills through the dungeon wall!", color.offwhite)
+        elif walls_drilled:
+            message_log.add_message(f"It drills through {walls_drilled} dungeon walls!", color.offwhite)
 
 
 class LeakingProjectile(Projectile):
@@ -730,11 +804,7 @@ class LeakingProjectile(Projectile):
         return SingleRangedAttackHandler(self.engine, callback=lambda xy: actions.ThrowItem(consumer, self.parent, xy))
 
     def start_activation(self,action):
-        if not self.engine.game_map.visible[action.target_xy]:
-            raise Impossible("You cannot target an area that you cannot see.")
-        if action.target_actor is action.entity:
-            raise Impossible("You cannot target yourself.")
-
+        self.require_visible_target(action, "You cannot target yourself.")
         super().start_activation(action)
 
     def activate(self, action: actions.ItemAction) -> None:
@@ -756,22 +826,22 @@ class DamageAllConsumable(Consumable):
         return [("rain acid on all nearby enemies, ",color.offwhite), (d,color.bile), (" dmg",color.offwhite)]
 
     def animate(self):
-        gm = self.engine.game_map
-        tiles = []
-        console = self.engine.console
+        engine = self.engine
+        gm = engine.game_map
+        fg = engine.console.tiles_rgb["fg"]
+        animation_beat = engine.animation_beat
+        palette = [color.bile,color.bile,color.b_bile]
 
-        for x in range(gm.width):
-            for y in range(gm.height):
-                if gm.visible[x,y] and gm.tile_is_walkable(x,y):
-                    tiles.append((x,y))
+        xs, ys = np.nonzero(gm.visible & gm.walkable_mask())
+        tiles = list(zip(xs.tolist(), ys.tolist()))
 
         random.shuffle(tiles)
 
         for x,y in tiles:
-            console.tiles_rgb["fg"][x,y] = random.choice([color.bile,color.bile,color.b_bile])
+            fg[x,y] = random.choice(palette)
             if random.random()<0.3:
-                self.engine.animation_beat(0.03,render=False)
-                self.engine.animation_beat(0)
+                animation_beat(0.03,render=False)
+                animation_beat(0)
 
 
 
@@ -779,14 +849,20 @@ class DamageAllConsumable(Consumable):
         self.animate()
 
         consumer = action.entity
-        actors = [a for a in self.engine.game_map.actors if self.engine.game_map.visible[a.x,a.y] and a is not self.engine.player]
+        engine = self.engine
+        player = engine.player
+        candidates = [a for a in engine.game_map.actors if a is not player]
+        xs = np.fromiter((a.x for a in candidates), dtype=np.intp, count=len(candidates))
+        ys = np.fromiter((a.y for a in candidates), dtype=np.intp, count=len(candidates))
+        actors = [candidates[i] for i in np.flatnonzero(engine.game_map.visible[xs, ys])]
 
         if len(actors) > 0:
-            self.engine.message_log.add_message("It rains acid on your opponents!")
+            engine.message_log.add_message("It rains acid on your opponents!")
+            damage = self.modified_damage
             for a in actors:
-                a.take_damage(self.modified_damage)
+                a.take_damage(damage)
         else:
-            self.engine.message_log.add_message("It rains acid on the dungeon.",color.grey)
+            engine.message_log.add_message("It rains acid on the dungeon.",color.grey)
 
 
 class ShieldingConsumable(Consumable):
@@ -838,11 +914,7 @@ class PhasingProjectile(Projectile):
         return SingleRangedAttackHandler(self.engine, callback=lambda xy: actions.ThrowItem(consumer, self.parent, xy))
 
     def start_activation(self,action):
-        if not self.engine.game_map.visible[action.target_xy]:
-            raise Impossible("You cannot target an area that you cannot see.")
-        if action.target_actor is action.entity:
-            raise Impossible("You cannot spit at yourself!")
-
+        self.require_visible_target(action, "You cannot spit at yourself!")
         super().start_activation(action)
 
     def activate(self, action: actions.ItemAction) -> None:
@@ -988,13 +1060,13 @@ class ReversingConsumable(Consumable):
         # any that aren't solid stay at the end in reverse order
         consumer = action.entity
 
-        tail = [i for i in consumer.inventory.items if i.blocks_movement]
-        if not tail:
+        tip = next((i for i in reversed(consumer.inventory.items) if i.blocks_movement), None)
+        if not tip:
             self.consume()
             self.engine.message_log.add_message("You spin in place.",color.grey)
             return
 
-        x,y = tail[-1].xy
+        x,y = tip.xy
 
         consumer.move(x-consumer.x,y-consumer.y)
 
@@ -1003,11 +1075,11 @@ class ReversingConsumable(Consumable):
                 i.place(x,y)
 
         if self.parent.blocks_movement:
-            consumer.inventory.items.reverse()
+            consumer.inventory.reverse()
             self.consume()
         else:
             self.consume()
-            consumer.inventory.items.reverse()
+            consumer.inventory.reverse()
 
         self.engine.check_word_mode()
 
@@ -1132,11 +1204,7 @@ class PetrifyEnemyConsumable(Projectile):
         return SingleRangedAttackHandler(self.engine, callback=lambda xy: actions.ThrowItem(consumer, self.parent, xy))
 
     def start_activation(self,action):
-        if not self.engine.game_map.visible[action.target_xy]:
-            raise Impossible("You cannot target an area that you cannot see.")
-        if action.target_actor is action.entity:
-            raise Impossible("You cannot target yourself.")
-
+        self.require_visible_target(action, "You cannot target yourself.")
         super().start_activation(action)
 
     def activate(self, action: actions.ItemAction) -> None:
@@ -1158,19 +1226,16 @@ class ClingyConsumable(Projectile):
         self.identify()
 
     def activate(self, action: actions.ItemAction) -> None:
-        inv = self.parent.gamemap.engine.player.inventory.items
-        index = inv.index(self.parent)
+        inventory = self.parent.gamemap.engine.player.inventory
+        index = inventory.items.index(self.parent)
         xy = self.parent.xy
 
         if index == 0:
             self.plop(action)
             return
 
-        other_index = index-1
-        other_item = inv[other_index]
-
-        inv[other_index] = self.parent
-        inv[index] = other_item
+        other_item = inventory.items[index-1]
+        inventory.swap(index-1, index)
 
         self.parent.place(*other_item.xy)
         other_item.place(*xy)
@@ -1222,8 +1287,7 @@ class FireballDamageConsumable(Projectile):
         )
 
     def start_activation(self,action):
-        if not self.engine.game_map.visible[action.target_xy]:
-            raise Impossible("You cannot target an area that you cannot see.")
+        self.require_visible_target(action)
         super().start_activation(action)
 
 
@@ -1231,13 +1295,18 @@ class FireballDamageConsumable(Projectile):
         target_xy = action.target_xy
         self.animate_explosion(target_xy,self.radius,[color.dragon,color.dragon,color.dragon,color.yellow,color.red])
 
+        gm = self.engine.game_map
+        x, y = target_xy
         targets_hit = False
-        for entity in list(self.engine.game_map.entities)[:]:
-            if entity.distance(*target_xy) <= self.radius and not entity.is_boss and self.engine.game_map.tiles["walkable"][target_xy[0],target_xy[1]]:
+        if gm.tiles["walkable"][x, y]:
+            damage = self.modified_damage
+            for entity in gm.entities_within(x, y, self.radius):
+                if entity.is_boss:
+                    continue
                 self.engine.message_log.add_message(
-                    f"The explosion engulfs the {entity.label}! It takes {self.modified_damage} damage!", color.offwhite,
+                    f"The explosion engulfs the {entity.label}! It takes {damage} damage!", color.offwhite,
                 )
-                entity.take_damage(self.modified_damage)
+                entity.take_damage(damage)
                 targets_hit = True
 
         if not targets_hit:
@@ -14,4 +14,37 @@ class Inventory(BaseComponent):
     parent: Actor
 
     def __init__(self):
-        self.items: List[Item] = []
\ No newline at end of file
+        self.items: List[Item] = []
+
+    @property
+    def items(self) -> List[Item]:
+        return self._items
+
+    @items.setter
+    def items(self, new_items: List[Item]):
+        self._items = new_items
+        self._items_set = set(new_items)
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "items" in state:
+            # saves from before the membership set keep the list as items
+            self.items = self.__dict__.pop("items")
+
+    def __contains__(self, item: Item) -> bool:
+        return item in self._items_set
+
+    def add(self, item: Item) -> None:
+        self._items.append(item)
+        self._items_set.add(item)
+
+    def remove(self, item: Item) -> None:
+        self._items.remove(item)
+        self._items_set.discard(item)
+
+    def swap(self, i: int, j: int) -> None:
+        items = self._items
+        items[i], items[j] = items[j], items[i]
+
+    def reverse(self) -> None:
+        self._items.reverse()
\ No newline at end of file
@@ -9,6 +9,7 @@ if TYPE_CHECKING:
 	from basilisk.entity import Actor
 
 class StatusEffect(BaseComponent):
+	__slots__ = ("parent", "_duration_mod", "duration")
 	parent: Actor
 	label = "<status>"
 	description = "(no description)"
@@ -22,6 +23,13 @@ class StatusEffect(BaseComponent):
 		self.duration = self.base_duration+self.duration_mod
 		self.apply()
 
+	def __setstate__(self, state):
+		# pickles from before __slots__ hold a plain __dict__, slotted ones (None, slot values)
+		if isinstance(state, tuple):
+			state = state[1]
+		for name, value in state.items():
+			setattr(self, name, value)
+
 	@property
 	def duration_mod(self):
 		return self._duration_mod
@@ -33,9 +41,19 @@ class StatusEffect(BaseComponent):
 
 	def apply(self):
 		self.parent.statuses.append(self)
+		self.parent.status_map.setdefault(type(self), self)
 
 	def remove(self):
-		self.parent.statuses.remove(self)
+		statuses = self.parent.statuses
+		statuses.remove(self)
+		status_map = self.parent.status_map
+		if status_map.get(type(self)) is self:
+			# promote another instance of the same type, if one is still active
+			successor = next((s for s in statuses if type(s) is type(self)), None)
+			if successor:
+				status_map[type(self)] = successor
+			else:
+				del status_map[type(self)]
 		if self.label and self.parent is self.engine.player:
 			self.engine.message_log.add_message(f"You are no longer {self.description}.", color.yellow)
 		elif self.label:
@@ -47,21 +65,26 @@ class StatusEffect(BaseComponent):
 
 
 class BadStatusEffect(StatusEffect):
+	__slots__ = ()
+
 	@property
 	def duration_mod(self):
 		return 0 - self._duration_mod
 
 
 class EnemyStatusEffect(StatusEffect):
-	pass
+	__slots__ = ()
 
 
 class _StatBoost(StatusEffect):
+	__slots__ = ()
 	label = None
 	description = None
 	color = None
 
 class StatBoost(_StatBoost):
+	__slots__ = ("amount", "stat")
+
 	def __init__(self, modifier: int, target, stat, amount):
 		self.amount = amount
 		self.stat = stat
@@ -73,6 +96,7 @@ class StatBoost(_StatBoost):
 
 
 class Doomed(StatusEffect):
+	__slots__ = ()
 	label="doom"
 	description="doomed"
 	color=color.red
@@ -86,6 +110,7 @@ class Doomed(StatusEffect):
 
 
 class Phasing(StatusEffect):
+	__slots__ = ()
 	label="phase"
 	description="phasing"
 	color=color.purple
@@ -109,6 +134,7 @@ class Phasing(StatusEffect):
 
 
 class PhasedOut(StatusEffect):
+	__slots__ = ()
 	label="phase"
 	description="phased out"
 	color=color.purple
@@ -119,6 +145,7 @@ class PhasedOut(StatusEffect):
 		msg = f"The {self.parent.name} phases out of existence."
 		self.engine.message_log.add_message(msg, color.offwhite)
 		self.parent.blocks_movement = False
+		self.gamemap.version += 1
 
 	def remove(self):
 		super().remove()
@@ -130,6 +157,7 @@ class PhasedOut(StatusEffect):
 			self.parent.die()
 			conflict.die()
 		self.parent.blocks_movement = True
+		self.gamemap.version += 1
 
 	@property
 	def duration_mod(self):
@@ -138,6 +166,7 @@ class PhasedOut(StatusEffect):
 
 
 class Leaking(EnemyStatusEffect):
+	__slots__ = ()
 	label="crumble"
 	description="crumbling"
 	color=color.bile
@@ -161,6 +190,7 @@ class Leaking(EnemyStatusEffect):
 
 
 class Shielded(StatusEffect):
+	__slots__ = ()
 	label="shield"
 	description="shielded"
 	color=color.grey
@@ -187,6 +217,7 @@ class Shielded(StatusEffect):
 
 
 class Petrified(EnemyStatusEffect):
+	__slots__ = ()
 	label="petrify"
 	description="petrified"
 	color=color.grey
@@ -207,6 +238,7 @@ class Petrified(EnemyStatusEffect):
 
 
 class PetrifiedSnake(StatusEffect):
+	__slots__ = ()
 	label="petrify"
 	description="petrified"
 	color=color.grey
@@ -228,6 +260,7 @@ class PetrifiedSnake(StatusEffect):
 
 
 class FreeSpit(StatusEffect):
+	__slots__ = ()
 	label="saliva"
 	description="salivating"
 	color=color.snake_green
@@ -249,6 +282,7 @@ class FreeSpit(StatusEffect):
 
 
 class PetrifEyes(StatusEffect):
+	__slots__ = ()
 	label = "petrify"
 	description = "petrifying"
 	color = color.cyan
@@ -265,6 +299,7 @@ class PetrifEyes(StatusEffect):
 
 
 class Choking(BadStatusEffect):
+	__slots__ = ()
 	label = "choke"
 	description = "choking"
 	color = color.tongue
@@ -279,6 +314,7 @@ class Choking(BadStatusEffect):
 
 
 class ThirdEyeBlind(BadStatusEffect):
+	__slots__ = ()
 	label ="daze"
 	description = "dazed"
 	color = color.red
@@ -5,6 +5,8 @@ import pickle
 import os
 import time
 
+import numpy as np
+
 from typing import TYPE_CHECKING
 
 from tcod.console import Console
@@ -15,7 +17,6 @@ from basilisk.actions import WaitAction, BumpAction
 from basilisk.message_log import MessageLog
 from basilisk.components.status_effect import PetrifEyes, Petrified, PhasedOut
 import basilisk.color as color
-from basilisk.components.ai import Constricted, Statue
 from basilisk.render_order import RenderOrder
 from basilisk.exceptions import Impossible
 from basilisk.components.consumable import TimeReverseConsumable
@@ -30,6 +31,7 @@ import utils
 class Engine:
     game_map: GameMap
     game_world: GameWorld
+    _words = None  # frozenset of valid words, loaded on first use
  
     def __init__(self, player: Actor, meta, terminal, console):
         self.message_log = MessageLog(self)
@@ -89,11 +91,11 @@ class Engine:
 
     @property
     def can_see_enemies(self):
-        return len([a for a in self.fov_actors if not isinstance(a.ai,Statue)]) > 0
+        return any(not a.is_statue for a in self.fov_actors)
 
     @property
     def an_enemy_is_constricted(self):
-        return len([i for i in self.game_map.actors if isinstance(i.ai,Constricted)]) > 0
+        return any(a.is_constricted for a in self.game_map.actors)
 
     @property
     def stairs_visible(self):
@@ -106,9 +108,11 @@ class Engine:
 
         t = 0.5/turns
 
-        for i in reversed(range(turn,self.turn_count)):
-            with open(utils.get_resource(f"snapshot_{i}.sav"), "rb") as f:
-                engine = pickle.loads(lzma.decompress(f.read()))
+        utils.flush_snapshots()  # a failed snapshot write re-raises here
+
+        # later snapshots unpickle in the background while earlier ones animate
+        for snapshot in utils.prefetch_snapshots(reversed(range(turn,self.turn_count))):
+            engine = snapshot.result()
             assert isinstance(engine, Engine)
             engine.game_map._next_id = self.game_map._next_id
             engine.game_map.item_factories = self.game_map.item_factories
@@ -119,8 +123,8 @@ class Engine:
 
         turner.identified = True
 
-        for i in [e for e in self.game_map.entities if e.id == turner.id]:
-            if i in self.player.inventory.items:
+        for i in self.game_map.get_entities_by_id(turner.id):
+            if i in self.player.inventory:
                 i.edible.consume()
                 i.edible.snake()
             else:
@@ -131,23 +135,33 @@ class Engine:
 
 
     def save_turn_snapshot(self):
-        self.save_as(utils.get_resource(f"snapshot_{self.turn_count}.sav"))
-        utils.del_old_snapshots(self.turn_count)
+        # snapshots only live for ~20 turns, so skip compression and
+        # write the raw pickle; it has to be taken now, but the disk
+        # write can finish in the background
+        utils.queue_snapshot(self.turn_count, self.dumps())
 
     def check_word_mode(self):
         if len(self.player.inventory.items) < 1:
             self.word_mode = False
             return
-        p_word = ''.join([i.char for i in self.player.inventory.items])
+        p_word = ''.join(i.char for i in self.player.inventory.items)
         self.word_mode = self.is_valid_word(p_word)
         if self.word_mode:
             self.history.append(('form word',p_word,self.turn_count))
 
     def is_valid_word(self,word):
-        return word in open(utils.get_resource("words.txt")).read().splitlines()
+        if Engine._words is None:
+            with open(utils.get_resource("words.txt")) as f:
+                Engine._words = frozenset(f.read().splitlines())
+        return word in Engine._words
 
     def handle_enemy_turns(self) -> None:
-        enemies = sorted(set(self.game_map.actors) - {self.player}, key=lambda x: x.id)
+        # The passes below must stay separate. Reading an intent can run
+        # decide(), which looks at the whole map, and pre_turn can kill a
+        # constricted enemy; every enemy has to see the same board before
+        # anyone acts. on_turn ticks statuses, so it can only run once all
+        # enemies have acted on this turn's state.
+        enemies = [a for a in self.game_map.actors if a is not self.player]
 
         if not self.word_mode:
             for entity in enemies:
@@ -160,13 +174,16 @@ class Engine:
                 entity.pre_turn()
 
         # enemy turns
+        # enemies can't change the player's petrifeyes, so check it once
+        petrifeyes = PetrifEyes in self.player.status_map
+        visible = self.game_map.visible
         for entity in enemies:
             if entity.ai:
                 # visible enemies during petrifeyes have no intent
                 if (
-                    any(isinstance(s,PetrifEyes) for s in self.player.statuses) and 
-                    self.game_map.visible[entity.x,entity.y] and 
-                    not isinstance(entity.ai, Constricted)
+                    petrifeyes and 
+                    visible[entity.x,entity.y] and 
+                    not entity.is_constricted
                 ):
                     entity.ai.clear_intent()
                     continue
@@ -174,10 +191,10 @@ class Engine:
                 # petrified and phased out enemies have no intent
                 if (
                     (
-                        any(isinstance(s,Petrified) for s in entity.statuses) or
-                        any(isinstance(s,PhasedOut) for s in entity.statuses)
+                        Petrified in entity.status_map or
+                        PhasedOut in entity.status_map
                     ) and
-                    not isinstance(entity.ai, Constricted)
+                    not entity.is_constricted
                 ):
                     entity.ai.clear_intent()
                     continue
@@ -203,46 +220,67 @@ class Engine:
         self.save_turn_snapshot()
 
     def animation_beat(self,t=0.12,render=True):
+        # pace beats by deadline so render time counts toward the beat;
+        # sleeping releases the GIL, letting snapshot work run meanwhile
+        deadline = time.perf_counter() + t
         self.mouse_location = (0,0)
         if render:
             self.console.clear()
             self.render(self.console)
         self.terminal.present(self.console,integer_scaling=True,clear_color=(10,10,10))
-        time.sleep(t)
+        remaining = deadline - time.perf_counter()
+        if remaining > 0:
+            time.sleep(remaining)
 
     @property
     def fov(self):
-        return compute_fov(
-            self.game_map.tiles["transparent"],
-            (self.player.x, self.player.y),
-            radius=self.fov_radius,
-        )
+        # enemies query this for every step they animate, so reuse the last
+        # shadowcast until the map, its tiles, or the player's view change
+        game_map = self.game_map
+        key = (game_map, game_map.tiles_version, self.player.x, self.player.y, self.fov_radius)
+        if getattr(self, "_fov_key", None) != key:
+            fov = compute_fov(
+                game_map.tiles["transparent"],
+                (self.player.x, self.player.y),
+                radius=self.fov_radius,
+            )
+            fov.flags.writeable = False
+            self._fov_key = key
+            self._fov = fov
+        return self._fov
 
     @property
     def fov_actors(self):
-        return [actor for actor in 
-            sorted(list(self.game_map.actors),key=lambda a:a.id) if
-            not actor is self.player and (
-                self.game_map.visible[actor.x,actor.y] or 
-                self.game_map.smellable(actor,True)
-            )
-        ]
+        # polled every frame by the sidebar and look handlers; only
+        # rebuild once something moved, spawned, died or the view changed
+        game_map = self.game_map
+        key = (game_map, game_map.version, game_map.visible_version, self.foi_radius)
+        if getattr(self, "_fov_actors_key", None) != key:
+            self._fov_actors = [actor for actor in 
+                game_map.actors if
+                not actor is self.player and (
+                    game_map.visible[actor.x,actor.y] or 
+                    game_map.smellable(actor,True)
+                )
+            ]
+            self._fov_actors_key = key
+        return self._fov_actors
 
     @property
     def mouse_things(self):
+        game_map = self.game_map
+        x,y = self.mouse_location
+        visible = game_map.visible[x,y]
+        explored = game_map.explored[x,y]
         entities = [
-            e for e in self.game_map.entities if 
-                (e.x,e.y) == self.mouse_location and 
-                (
-                    self.game_map.visible[e.x,e.y] or 
-                    (self.game_map.explored[e.x,e.y] and e.render_order == RenderOrder.ITEM) or
-                    self.game_map.smellable(e, True)
-                )
+            e for e in game_map.get_entities_at_location(x,y) if 
+                visible or 
+                (explored and e.render_order == RenderOrder.ITEM) or
+                game_map.smellable(e, True)
         ]
 
-        x,y = self.mouse_location
-        if self.game_map.visible[x,y] or self.game_map.explored[x,y] or self.game_map.mapped[x,y]:
-            entities += [self.game_map.tiles[x,y]]
+        if visible or explored or game_map.mapped[x,y]:
+            entities += [game_map.tiles[x,y]]
 
         return entities
 
@@ -250,9 +288,13 @@ class Engine:
 
     def update_fov(self) -> None:
         """Recompute the visible area based on the players point of view."""
-        self.game_map.visible[:] = self.fov
+        game_map = self.game_map
+        # self.fov is a shared, memoized array: copy it into the map's own
+        # buffer rather than handing out the cached one
+        np.copyto(game_map.visible, self.fov)
+        game_map.visible_version += 1
         # If a tile is "visible" it should be added to "explored".
-        self.game_map.explored |= self.game_map.visible
+        np.logical_or(game_map.explored, game_map.visible, out=game_map.explored)
 
     @property
     def do_turn_count(self):
@@ -271,9 +313,7 @@ class Engine:
         # mid: 40 w (21,41)
         # right: 18 w (62,41)
 
-        self.frames += 1
-        if self.frames > 1023:
-            self.frames = 0
+        self.frames = (self.frames + 1) & 1023
 
         self.game_map.render(console)
 
@@ -323,17 +363,40 @@ class Engine:
             pass
 
 
-    def save_as(self, filename: str) -> None:
-        """Save this Engine instance as a compressed file."""
+    def __getstate__(self):
+        # the fov memos rebuild on first use, and the main handler is recreated on
+        # demand, so keep them out of saves and snapshots
+        state = self.__dict__.copy()
+        for memo in ("_fov_key", "_fov", "_fov_actors_key", "_fov_actors", "main_handler"):
+            state.pop(memo, None)
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # a save from before the entity indexes: when the engine is the root of the
+        # load every entity is restored by now. A deepcopy that reaches the engine
+        # through an entity can get here before the map itself, so leave that alone.
+        game_map = vars(self).get("game_map")
+        if game_map is not None and "entities" in vars(game_map) and "actor_index" not in vars(game_map):
+            game_map.index_entities()
+
+    def dumps(self) -> bytes:
+        """Pickle this Engine instance, leaving out meta, terminal and console."""
         meta = self.meta
         terminal = self.terminal
         console = self.console
         self.meta = None
         self.terminal = None
         self.console = None
-        save_data = lzma.compress(pickle.dumps(self))
+        try:
+            return pickle.dumps(self, pickle.HIGHEST_PROTOCOL)
+        finally:
+            self.meta = meta
+            self.terminal = terminal
+            self.console = console
+
+    def save_as(self, filename: str) -> None:
+        """Save this Engine instance as a compressed file."""
+        save_data = lzma.compress(self.dumps(), preset=1)
         with open(filename, "wb") as f:
-            f.write(save_data)
-        self.meta = meta
-        self.terminal = terminal
-        self.console = console
\ No newline at end of file
+            f.write(save_data)
\ No newline at end of file
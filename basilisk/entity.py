@@ -5,8 +5,6 @@ import math
 import random
 from typing import Optional, Tuple, Type, TypeVar, TYPE_CHECKING, Union, Set
 
-from tcod.map import compute_fov
-
 from basilisk.render_order import RenderOrder
 
 from basilisk import color as Color
@@ -59,15 +57,38 @@ class Entity:
         self._description=description
         self.rarity = rarity
         self.statuses=[]
+        self.status_map={}
         self.base_stats = {"BILE":0,"MIND":0,"TAIL":0,"TONG":0}
         self._flavor = flavor
         if parent:
             # If parent isn't provided now then it will be set later.
             self.parent = parent
-            parent.entities.add(self)
+            parent.add_entity(self)
         self.unpetrified_on = 0
         self.petrified_on = 0
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "status_map" not in state:
+            # saves from before the status index only have the list
+            self.status_map = {}
+            for status in self.statuses:
+                self.status_map.setdefault(type(status), status)
+        if "render_order" in state:
+            # saves from before the render_order property; the map's draw order
+            # is rebuilt on load anyway, so skip the setter
+            self._render_order = self.__dict__.pop("render_order")
+
+    @property
+    def render_order(self):
+        return self._render_order
+
+    @render_order.setter
+    def render_order(self, new_val):
+        self._render_order = new_val
+        if hasattr(self, 'parent'):
+            self.gamemap.render_sorted = None
+
     @property
     def char(self):
         val = self._char if not self.is_phased_out else ' '
@@ -119,7 +140,7 @@ class Entity:
 
     @property
     def is_phased_out(self) -> bool:
-        return any(isinstance(s,PhasedOut) for s in self.statuses)
+        return PhasedOut in self.status_map
 
     @property
     def flavor(self):
@@ -128,7 +149,14 @@ class Entity:
     def get_word_mode_boost(self, stat:str):
         return len([i for i in self.inventory.items if i.stat == stat and i.identified]) if self.engine.word_mode else 0
 
+    def get_status(self, status_type):
+        """Return the active status of exactly this type, or None."""
+        return self.status_map.get(status_type)
+
     def get_status_boost(self, stat:str):
+        # stats are read every frame; most of the time nothing is boosted
+        if StatBoost not in self.status_map:
+            return 0
         return sum([s.amount for s in self.statuses if isinstance(s, StatBoost) and s.stat == stat])
 
     def get_stat(self, stat: str):
@@ -145,7 +173,7 @@ class Entity:
         clone.parent = gamemap
         clone.id = gamemap.next_id
         clone.preSpawn()
-        gamemap.entities.add(clone)
+        gamemap.add_entity(clone)
         return clone
 
     def preSpawn(self):
@@ -153,14 +181,20 @@ class Entity:
 
     def place(self, x: int, y: int, gamemap: Optional[GameMap] = None) -> None:
         """Place this entity at a new location.  Handles moving across GameMaps."""
-        self.x = x
-        self.y = y
-        if gamemap:
-            if hasattr(self, "parent"):  # Possibly uninitialized.
-                if self.parent is self.gamemap:
-                    self.gamemap.entities.remove(self)
-            self.parent = gamemap
-            gamemap.entities.add(self)
+        if not gamemap:
+            self.gamemap.move_entity(self, x, y)
+            return
+
+        if hasattr(self, "parent"):  # Possibly uninitialized.
+            if self.parent is self.gamemap and self.gamemap is not gamemap:
+                self.gamemap.remove_entity(self)
+        self.parent = gamemap
+        if self in gamemap.entities:
+            gamemap.move_entity(self, x, y)
+        else:
+            self.x = x
+            self.y = y
+            gamemap.add_entity(self)
 
     def distance(self, x: int, y: int) -> float:
         """
@@ -177,10 +211,9 @@ class Entity:
             not self.engine.game_map.tile_is_snakeable(self.x+dx,self.y+dy,phasing=False) and 
             self.is_phasing
         ):
-            [s for s in self.statuses if isinstance(s,Phasing)][0].decrement(False)
+            self.status_map[Phasing].decrement(False)
 
-        self.x += dx
-        self.y += dy
+        self.gamemap.move_entity(self, self.x + dx, self.y + dy)
 
         # Snake thyself
         if self is self.engine.player:
@@ -222,28 +255,37 @@ class Entity:
 
 
     def is_next_to_player(self):
-        for d in DIRECTIONS:
-            if self.gamemap.get_actor_at_location(d[0]+self.x,d[1]+self.y) is self.engine.player:
+        gamemap = self.gamemap
+        player = self.engine.player
+        x, y = self.x, self.y
+        for dx, dy in DIRECTIONS:
+            if gamemap.get_actor_at_location(x+dx,y+dy) is player:
                 return True
-            if self.gamemap.get_item_at_location(d[0]+self.x,d[1]+self.y) in self.engine.player.inventory.items:
+            if gamemap.get_item_at_location(x+dx,y+dy) in player.inventory:
                 return True
         return False
 
     def how_next_to_player(self):
+        gamemap = self.gamemap
+        player = self.engine.player
+        x, y = self.x, self.y
         how = 0
-        for d in DIRECTIONS:
-            if self.gamemap.get_actor_at_location(d[0]+self.x,d[1]+self.y) is self.engine.player:
+        for dx, dy in DIRECTIONS:
+            if gamemap.get_actor_at_location(x+dx,y+dy) is player:
                 how += 1
-            elif self.gamemap.get_item_at_location(d[0]+self.x,d[1]+self.y) in self.engine.player.inventory.items:
+            elif gamemap.get_item_at_location(x+dx,y+dy) in player.inventory:
                 how += 1
         return how
 
     def get_adjacent_actors(self)->List[Actor]:
+        actor_index = self.gamemap.actor_index
+        x, y = self.x, self.y
         actors = []
-        for d in DIRECTIONS:
-            a = self.gamemap.get_actor_at_location(d[0]+self.x,d[1]+self.y)
-            if a:
-                actors.append(a)
+        for dx, dy in DIRECTIONS:
+            for a in actor_index.get((x + dx, y + dy), ()):
+                if a.is_alive and not a.is_phased_out:
+                    actors.append(a)
+                    break
         return actors
 
 
@@ -285,6 +327,7 @@ class Actor(Entity):
         self.ai: Optional[BaseAI] = ai_cls(self)
 
         self.statuses = []
+        self.status_map = {}
         self.drop_tier = drop_tier
         self.is_boss = is_boss
 
@@ -293,10 +336,10 @@ class Actor(Entity):
     @property
     def color(self):
         if (
-            any( isinstance(s,Petrified) for s in self.statuses ) or
+            Petrified in self.status_map or
             self.is_shielded or
             ( 
-                any( isinstance(s,PetrifEyes) for s in self.engine.player.statuses ) and
+                PetrifEyes in self.engine.player.status_map and
                 not self is self.engine.player and
                 not self.is_boss
             )
@@ -308,16 +351,29 @@ class Actor(Entity):
 
         return self._color
 
+    def __setstate__(self, state):
+        super().__setstate__(state)
+        if "ai" in state:
+            # saves from before the ai property; the setter also fills in the flags
+            self.ai = self.__dict__.pop("ai")
+
     @property
-    def is_constricted(self):
-        return isinstance(self.ai,Constricted)
+    def ai(self) -> Optional[BaseAI]:
+        return self._ai
+
+    @ai.setter
+    def ai(self, new_ai: Optional[BaseAI]):
+        # the enemy loop and sidebar ask these every turn, so settle them here
+        self._ai = new_ai
+        self.is_constricted = isinstance(new_ai, Constricted)
+        self.is_statue = isinstance(new_ai, Statue)
 
     @property
     def is_petrified(self):
         if self is self.engine.player:
-            return any(isinstance(s,PetrifiedSnake) for s in self.statuses)
+            return PetrifiedSnake in self.status_map
         else:
-            return any(isinstance(s,Petrified) for s in self.statuses)
+            return Petrified in self.status_map
 
     @color.setter
     def color(self, new_val):
@@ -330,15 +386,15 @@ class Actor(Entity):
 
     @property
     def is_shielded(self) -> bool:
-        return any(isinstance(s, Shielded) for s in self.statuses)
+        return Shielded in self.status_map
 
     @property
     def is_phasing(self) -> bool:
-        return any(isinstance(s,Phasing) for s in self.statuses)
+        return Phasing in self.status_map
 
     @property
     def is_choking(self) -> bool:
-        return any(isinstance(s,Choking) for s in self.statuses)
+        return Choking in self.status_map
 
     @property
     def in_danger(self) -> bool:
@@ -348,26 +404,21 @@ class Actor(Entity):
             if(
                 entity is self or
                 entity.is_constricted or
-                any(isinstance(s,Petrified) for s in entity.statuses) or
-                any(isinstance(s,PhasedOut) for s in entity.statuses) or
+                Petrified in entity.status_map or
+                PhasedOut in entity.status_map or
                 (
-                    any(isinstance(s,PetrifEyes) for s in self.engine.player.statuses) and
+                    PetrifEyes in self.engine.player.status_map and
                     self.gamemap.visible[entity.x,entity.y]
                 )
             ):
                 continue
 
             # check fom if you can't see intents
-            if not self.engine.word_mode or any(isinstance(s,ThirdEyeBlind) for s in self.statuses):
+            if not self.engine.word_mode or ThirdEyeBlind in self.status_map:
                 if not self.gamemap.visible[entity.x,entity.y] or entity.move_speed < 1:
                     continue
 
-                fom = compute_fov(
-                    self.gamemap.tiles["transparent"],
-                    (entity.x,entity.y),
-                    radius=entity.move_speed,
-                    light_walls=False
-                )
+                fom = self.gamemap.compute_fov(entity.x, entity.y, entity.move_speed, light_walls=False)
 
                 for x,row in enumerate(fom):
                     for y,cel in enumerate(row):
@@ -389,7 +440,7 @@ class Actor(Entity):
         return False
 
     def hit_shield(self):
-        [s for s in self.statuses if isinstance(s, Shielded)][0].decrement(False)
+        self.status_map[Shielded].decrement(False)
 
     def can_move(self):
         # Make sure player can move, otherwise die    
@@ -423,22 +474,30 @@ class Actor(Entity):
             self.update_constrict()
 
     def on_turn(self) -> None:
-        if isinstance(self.ai, Constricted):
+        if self.is_constricted:
             self.update_constrict()
         for status in self.statuses:
             status.decrement()
 
-    def constrict(self) -> None:
+    def constrict(self, tail: Optional[int] = None) -> None:
         if self.is_constricted or self.name == "Decoy":
             return
         self.engine.message_log.add_message(f"You constrict the {self.name}!", Color.offwhite)
         self.ai = Constricted(self, self.ai, self.color)
-        char_num = int(self.char)- (1 + self.engine.player.TAIL) if not self.is_boss else int(self.char) - 1
+        if tail is None:
+            tail = self.engine.player.TAIL
+        char_num = int(self.char)- (1 + tail) if not self.is_boss else int(self.char) - 1
         if char_num < 0:
             self.die()
         else:
             self.char = str(char_num)
 
+    def constrict_adjacent(self) -> None:
+        """Constrict every actor next to this one, looking up TAIL only once."""
+        tail = self.TAIL
+        for enemy in self.get_adjacent_actors():
+            enemy.constrict(tail)
+
     def corpse(self) -> None:
         self.gamemap.bloody_floor(self.x,self.y)
 
@@ -461,6 +520,7 @@ class Actor(Entity):
 
     def die(self) -> None:
         self.ai = None
+        self.gamemap.actors_changed()
         if self.engine.player is self:
             death_message = "You died!"
             death_message_color = Color.dark_red
@@ -475,7 +535,7 @@ class Actor(Entity):
             self.engine.history.append(("kill enemy",self.name,self.engine.turn_count))
 
             if self in self.gamemap.entities:
-                self.gamemap.entities.remove(self)
+                self.gamemap.remove_entity(self)
 
             if self.is_boss:
                 self.engine.boss_killed = True
@@ -620,29 +680,31 @@ class Item(Entity):
 
     def solidify(self):
         self.blocks_movement = True
+        self.gamemap.version += 1
         self.render_order = RenderOrder.ACTOR
         if self.item_type == 'v':
             self.color = Color.player
 
     def desolidify(self):
         self.blocks_movement = False
+        self.gamemap.version += 1
         self.render_order = RenderOrder.ITEM
         if self.item_type == 'v':
             self.color = Color.vowel
-        if self in self.engine.player.inventory.items:
-            self.engine.player.inventory.items.remove(self)
+        if self in self.engine.player.inventory:
+            self.engine.player.inventory.remove(self)
 
     #remove the item from the game
     def consume(self):
-        self.gamemap.entities.remove(self)
-        if self in self.engine.player.inventory.items:
-            self.engine.player.inventory.items.remove(self)
+        self.gamemap.remove_entity(self)
+        if self in self.engine.player.inventory:
+            self.engine.player.inventory.remove(self)
         self.engine.check_word_mode()
 
     def take_damage(self, amount: int):
         player = self.gamemap.engine.player
 
-        if self in player.inventory.items:
+        if self in player.inventory:
             if player.is_shielded:
                 player.hit_shield()
                 return
@@ -654,7 +716,7 @@ class Item(Entity):
             self.engine.history.append(("break item",f"{self.name} ({self.char})",self.engine.turn_count))
         
         else:
-            self.gamemap.entities.remove(self)
+            self.gamemap.remove_entity(self)
 
     def die(self):
         self.take_damage(1)
@@ -1,6 +1,7 @@
 from __future__ import annotations
 
-from typing import Iterable, Iterator, Optional, TYPE_CHECKING
+from typing import Iterable, List, Optional, Tuple, TYPE_CHECKING
+from operator import attrgetter
 
 import numpy as np  # type: ignore
 from tcod.console import Console
@@ -10,7 +11,7 @@ import random
 from basilisk import color, tile_types
 from basilisk.entity import Actor, Item
 from basilisk.actions import ActionWithDirection
-from basilisk.render_functions import DIRECTIONS, D_ARROWS
+from basilisk.render_functions import DIRECTION_ARROWS
 from basilisk.components.status_effect import ThirdEyeBlind, Petrified, PetrifEyes, PhasedOut
 from basilisk.components.ai import Statue
 
@@ -18,6 +19,8 @@ if TYPE_CHECKING:
     from basilisk.engine import Engine
     from basilisk.entity import Entity
 
+render_order_key = attrgetter("render_order.value")
+
 
 class GameMap:
     def __init__(
@@ -26,7 +29,22 @@ class GameMap:
         self.engine = engine
         self.width, self.height = width, height
         self.entities = set(entities)
+        self.actor_index = {}
+        self.item_index = {}
+        self.version = 0  # bumped whenever tiles or entity positions change
+        self.tiles_version = 0  # bumped only when tiles change
+        self.visible_version = 0  # bumped whenever the player's view is recomputed
+        self.path_cache = {}
+        self.fov_cache = {}  # (x, y, radius, light_walls) -> fov, for the current tiles_version
+        self.fov_cache_version = 0
+        self.blocked_cache = None  # (version, mask) from the last blocked_mask call
+        self.living_actors = None  # living actors in id order; rebuilt after adds, removes and deaths
+        self.boss_actor = None
+        self.item_list = None  # rebuilt after items are added or removed
+        self.render_sorted = None  # entities in draw order; rebuilt after adds, removes and render_order changes
+        self.index_entities()
         self.tiles = np.full((width, height), fill_value=tile_types.wall, order="F")
+        self.field_views()
 
         self.visible = np.full(
             (width, height), fill_value=False, order="F"
@@ -47,21 +65,29 @@ class GameMap:
         self.game_mode = game_mode
 
     @property
-    def actors(self) -> Iterable[Actor]:
-        """Iterate over this maps living actors."""
-        return [
-            entity
-            for entity in self.entities
-            if isinstance(entity, Actor) and entity.is_alive
-        ]
+    def actors(self) -> List[Actor]:
+        """This maps living actors, in id order. The list is shared, so don't mutate it."""
+        if self.living_actors is None:
+            self.living_actors = sorted(
+                (entity for entity in self.entities if isinstance(entity, Actor) and entity.is_alive),
+                key=lambda a: a.id
+            )
+            self.boss_actor = next((a for a in self.living_actors if a.is_boss), None)
+        return self.living_actors
+
+    def actors_changed(self) -> None:
+        self.living_actors = None
 
     @property
     def gamemap(self) -> GameMap:
         return self
 
     @property
-    def items(self) -> Iterator[Item]:
-        yield from (entity for entity in self.entities if isinstance(entity, Item))
+    def items(self) -> List[Item]:
+        """This maps items. The list is shared, so don't mutate it."""
+        if self.item_list is None:
+            self.item_list = [entity for entity in self.entities if isinstance(entity, Item)]
+        return self.item_list
 
     @property
     def next_id(self):
@@ -70,17 +96,135 @@ class GameMap:
 
     @property
     def boss(self):
-        return [a for a in self.actors if a.is_boss][0]
+        self.actors  # refreshes boss_actor along with the actor list
+        if self.boss_actor is None:
+            raise IndexError("no boss on this map")
+        return self.boss_actor
+
+    def index_entities(self) -> None:
+        """Build the location and id indexes from scratch."""
+        self.actor_index = {}
+        self.item_index = {}
+        self.id_index = {}
+        for entity in self.entities:
+            self.index_entity(entity)
+            self.id_index.setdefault(getattr(entity, "id", None), []).append(entity)
+
+    def index_for(self, entity: Entity) -> dict:
+        return self.actor_index if isinstance(entity, Actor) else self.item_index
+
+    def index_entity(self, entity: Entity) -> None:
+        self.index_for(entity).setdefault(entity.xy, []).append(entity)
+
+    def unindex_entity(self, entity: Entity) -> None:
+        index = self.index_for(entity)
+        bucket = index.get(entity.xy)
+        if bucket and entity in bucket:
+            bucket.remove(entity)
+            if not bucket:
+                del index[entity.xy]
+
+    def add_entity(self, entity: Entity) -> None:
+        self.entities.add(entity)
+        self.index_entity(entity)
+        self.id_index.setdefault(getattr(entity, "id", None), []).append(entity)
+        if isinstance(entity, Actor):
+            self.actors_changed()
+        elif isinstance(entity, Item):
+            self.item_list = None
+        self.render_sorted = None
+        self.version += 1
+
+    def remove_entity(self, entity: Entity) -> None:
+        self.entities.remove(entity)
+        self.unindex_entity(entity)
+        entity_id = getattr(entity, "id", None)
+        bucket = self.id_index.get(entity_id)
+        if bucket and entity in bucket:
+            bucket.remove(entity)
+            if not bucket:
+                del self.id_index[entity_id]
+        if isinstance(entity, Actor):
+            self.actors_changed()
+        elif isinstance(entity, Item):
+            self.item_list = None
+        self.render_sorted = None
+        self.version += 1
+
+    def get_entities_by_id(self, entity_id: int) -> List[Entity]:
+        return list(self.id_index.get(entity_id, ()))
+
+    def move_entity(self, entity: Entity, x: int, y: int) -> None:
+        """Set an entity's position, keeping the location index in sync."""
+        if entity not in self.entities:
+            entity.x, entity.y = x, y
+            return
+        self.unindex_entity(entity)
+        entity.x, entity.y = x, y
+        self.index_entity(entity)
+        self.version += 1
+
+    def field_views(self) -> None:
+        """Keep views of the hot tile fields so lookups skip the per-call field view."""
+        self.walkable_tiles = self.tiles["walkable"]
+        self.snakeable_tiles = self.tiles["snakeable"]
+
+    def __getstate__(self):
+        # cached fovs are cheap to rebuild and would bloat every turn snapshot,
+        # and the field views would pickle as copies detached from self.tiles
+        state = self.__dict__.copy()
+        state["fov_cache"] = {}
+        state["blocked_cache"] = None
+        del state["walkable_tiles"], state["snakeable_tiles"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        # saves from before the indexes and caches; the entities may not be restored
+        # yet, so the engine rebuilds the indexes once it is (see Engine.__setstate__)
+        for name in ("version", "tiles_version", "visible_version", "fov_cache_version"):
+            self.__dict__.setdefault(name, 0)
+        for name in ("path_cache", "fov_cache"):
+            self.__dict__.setdefault(name, {})
+        for name in ("blocked_cache", "living_actors", "boss_actor", "item_list", "render_sorted"):
+            self.__dict__.setdefault(name, None)
+        self.field_views()
+
+    def compute_fov(self, x: int, y: int, radius: int, light_walls: bool = True) -> np.ndarray:
+        """compute_fov over this map's transparency, memoized until the tiles change.
+
+        The returned array is shared, so it is read-only."""
+        if self.fov_cache_version != self.tiles_version:
+            self.fov_cache.clear()
+            self.fov_cache_version = self.tiles_version
+        key = (x, y, radius, light_walls)
+        fov = self.fov_cache.get(key)
+        if fov is None:
+            if len(self.fov_cache) >= 256:
+                self.fov_cache.clear()
+            fov = compute_fov(self.tiles["transparent"], (x, y), radius=radius, light_walls=light_walls)
+            fov.flags.writeable = False
+            self.fov_cache[key] = fov
+        return fov
+
+    def tiles_changed(self) -> None:
+        """Call after writing to self.tiles once the map is in play."""
+        self.version += 1
+        self.tiles_version += 1
 
     def bloody_floor(self,x,y):
         if self.tiles[x,y] == tile_types.floor:
             self.tiles[x,y] = tile_types.bloody_floor
+            self.tiles_changed()
 
 
+    def player_distance(self, entity: Entity) -> int:
+        """Chebyshev distance from the player to entity."""
+        player = self.engine.player
+        return max(abs(entity.x - player.x), abs(entity.y - player.y))
+
     def smellable(self,entity: Entity, super_smell:bool=False):
-        dx = entity.x-self.engine.player.x
-        dy = entity.y-self.engine.player.y
-        distance = max(abs(dx),abs(dy))
+        distance = self.player_distance(entity)
 
         if super_smell:
             return distance <= self.engine.foi_radius
@@ -89,72 +233,110 @@ class GameMap:
 
 
     def make_mapped(self):
-        for i,row in enumerate(self.mapped):
-            for j, tile in enumerate(row):
-                if self.tiles[i,j] not in (tile_types.wall):
-                    self.mapped[i,j] = True
-                if self.tiles[i,j] == tile_types.down_stairs:
-                    self.explored[i,j] = True
+        self.mapped |= self.tiles != tile_types.wall
+        self.explored |= self.tiles == tile_types.down_stairs
 
     
+    def get_entities_at_location(self, x: int, y: int) -> List[Entity]:
+        """Return every entity at x, y: actors first, then items."""
+        xy = (x, y)
+        return [*self.actor_index.get(xy, ()), *self.item_index.get(xy, ())]
+
+    def entities_within(self, x: int, y: int, radius: int) -> List[Entity]:
+        """Return every entity within `radius` tiles (euclidean) of x, y."""
+        r2 = radius*radius
+        return [
+            entity
+            for i in range(max(x-radius, 0), min(x+radius+1, self.width))
+            for j in range(max(y-radius, 0), min(y+radius+1, self.height))
+            if (i-x)*(i-x) + (j-y)*(j-y) <= r2
+            for entity in self.get_entities_at_location(i, j)
+        ]
+
     def get_blocking_entity_at_location(
         self, location_x: int, location_y: int,
     ) -> Optional[Entity]:
-        for entity in self.entities:
-            if (
-                entity.blocks_movement
-                and entity.x == location_x
-                and entity.y == location_y
-            ):
+        xy = (location_x, location_y)
+        for entity in self.actor_index.get(xy, ()):
+            if entity.blocks_movement:
+                return entity
+        for entity in self.item_index.get(xy, ()):
+            if entity.blocks_movement:
                 return entity
 
         return None
 
     def get_actor_at_location(self, x: int, y: int) -> Optional[Actor]:
-        for actor in self.actors:
-            if actor.x == x and actor.y == y and not actor.is_phased_out:
+        for actor in self.actor_index.get((x, y), ()):
+            if actor.is_alive and not actor.is_phased_out:
                 return actor
 
         return None
 
     def get_item_at_location(self, x: int, y: int) -> Optional[Item]:
-        for item in self.items:
-            if item.x == x and item.y == y:
-                return item
+        for item in self.item_index.get((x, y), ()):
+            return item
 
         return None
 
     def tile_is_walkable(self, x: int, y: int, phasing: bool = False, entities: bool = True) -> bool:
-        if not self.in_bounds(x, y):
+        if not (0 <= x < self.width and 0 <= y < self.height):
             return False
-        if not self.tiles["walkable"][x, y] and not phasing:
+        if not phasing and not self.walkable_tiles[x, y]:
             return False
-        if self.get_blocking_entity_at_location(x, y) and entities:
+        if entities and self.get_blocking_entity_at_location(x, y):
             return False
         return True
 
     def tile_is_snakeable(self, x: int, y: int, phasing: bool = False) -> bool:
-        if not self.in_bounds(x, y):
+        if not (0 <= x < self.width and 0 <= y < self.height):
             return False
-        if not self.tiles["snakeable"][x, y] and not phasing:
+        if not phasing and not self.snakeable_tiles[x, y]:
             return False
         if self.get_blocking_entity_at_location(x,y):
             return False
         return True
 
+    def blocked_mask(self) -> np.ndarray:
+        """Return a map-sized array marking every tile held by a blocking entity.
+
+        The array is shared until the map's version changes, so it is read-only."""
+        if self.blocked_cache is not None and self.blocked_cache[0] == self.version:
+            return self.blocked_cache[1]
+        blocked = np.zeros((self.width, self.height), dtype=bool, order="F")
+        for index in (self.actor_index, self.item_index):
+            for (x, y), entities in index.items():
+                if any(entity.blocks_movement for entity in entities):
+                    blocked[x, y] = True
+        blocked.flags.writeable = False
+        self.blocked_cache = (self.version, blocked)
+        return blocked
+
+    def walkable_mask(self, entities: bool = True) -> np.ndarray:
+        """tile_is_walkable for every tile of the map at once."""
+        walkable = self.walkable_tiles.copy(order="F")
+        if entities:
+            walkable &= ~self.blocked_mask()
+        return walkable
+
     def in_bounds(self, x: int, y: int) -> bool:
         """Return True if x and y are inside of the bounds of this map."""
         return 0 <= x < self.width and 0 <= y < self.height
 
-    def print_intent(self, console: Console, entity: Actor, highlight: bool = False):
+    def player_xys(self) -> frozenset:
+        """Every tile the player's head or body segments occupy."""
+        player = self.engine.player
+        return frozenset([player.xy, *(i.xy for i in player.inventory.items)])
+
+    def print_intent(self, console: Console, entity: Actor, highlight: bool = False, player_xys: Optional[frozenset] = None):
         if (
-            any(isinstance(s,ThirdEyeBlind) for s in self.engine.player.statuses) or
+            ThirdEyeBlind in self.engine.player.status_map or
             entity is self.engine.player or
             not isinstance(entity, Actor) or
-            any(isinstance(s,Petrified) for s in entity.statuses) or
-            any(isinstance(s,PhasedOut) for s in entity.statuses) or
+            Petrified in entity.status_map or
+            PhasedOut in entity.status_map or
             (
-                any(isinstance(s,PetrifEyes) for s in self.engine.player.statuses) and
+                PetrifEyes in self.engine.player.status_map and
                 self.visible[entity.x,entity.y]
             )
         ):
@@ -168,13 +350,15 @@ class GameMap:
             return
 
         x, y = entity.xy
+        if player_xys is None:
+            player_xys = self.player_xys()
 
         for intent in entity.ai.intent:
             x += intent.dx
             y += intent.dy
 
             fg = color.intent_bg if not highlight else color.highlighted_intent_bg
-            attacking_player = (x,y) == self.engine.player.xy or (x,y) in [i.xy for i in self.engine.player.inventory.items]
+            attacking_player = (x,y) in player_xys
             fgcolor = fg if not attacking_player else color.black
             bgcolor = None if not attacking_player else color.intent_bg
 
@@ -182,26 +366,35 @@ class GameMap:
                 console.print(
                     x=x,
                     y=y,
-                    string=D_ARROWS[DIRECTIONS.index((intent.dx,intent.dy))],
+                    string=DIRECTION_ARROWS[(intent.dx,intent.dy)],
                     fg=fgcolor,
                     bg=bgcolor
                 )
 
+    def radius_box(self, x: int, y: int, radius: int) -> Tuple[slice, slice]:
+        """Slices of the map within radius of (x, y) along each axis, clipped to the map.
+
+        Like compute_fov, a radius of 0 means no limit."""
+        if radius <= 0:
+            return slice(0, self.width), slice(0, self.height)
+        return (
+            slice(max(0, x - radius), min(self.width, x + radius + 1)),
+            slice(max(0, y - radius), min(self.height, y + radius + 1)),
+        )
+
     def print_enemy_fom(self, console: Console, entity: Actor):
         if not self.visible[entity.x,entity.y] and not self.smellable(entity, True):
             return
 
-        fom = compute_fov(
-            self.tiles["transparent"],
-            (entity.x,entity.y),
-            radius=entity.move_speed,
-            light_walls=False
-        )
+        box = self.radius_box(entity.x, entity.y, entity.move_speed)
+        if not self.visible[box].any():
+            return
 
-        for x,row in enumerate(fom):
-            for y,cel in enumerate(row):
-                if cel and self.visible[x,y] and (x != entity.x or y != entity.y):
-                    console.tiles_rgb[x,y]['bg'] = color.highlighted_fom
+        fom = self.compute_fov(entity.x, entity.y, entity.move_speed, light_walls=False)
+
+        mask = fom[box] & self.visible[box]
+        mask[entity.x - box[0].start, entity.y - box[1].start] = False
+        console.tiles_rgb[box]['bg'][mask] = color.highlighted_fom
 
     def print_enemy_fov(self, console: Console, entity: Actor):
         if (
@@ -211,19 +404,17 @@ class GameMap:
         ):
             return
 
-        fov = compute_fov(
-            self.tiles["transparent"],
-            (entity.x, entity.y),
-            radius=8,
-            light_walls=False
-        )
+        box = self.radius_box(entity.x, entity.y, 8)
+        if not self.visible[box].any():
+            return
+
+        fov = self.compute_fov(entity.x, entity.y, 8, light_walls=False)
 
-        for x,row in enumerate(fov):
-            for y,cel in enumerate(row):
-                if cel and self.visible[x,y] and (x != entity.x or y != entity.y):
-                    console.tiles_rgb[x,y]['bg'] = color.highlighted_fov
-                    console.tiles_rgb[x,y]['fg'] = (40,40,40)
-                    #console.print(x=x,y=y,string=" ",bg=color.highlighted_fov)
+        mask = fov[box] & self.visible[box]
+        mask[entity.x - box[0].start, entity.y - box[1].start] = False
+        tiles_rgb = console.tiles_rgb[box]
+        tiles_rgb['bg'][mask] = color.highlighted_fov
+        tiles_rgb['fg'][mask] = (40,40,40)
 
 
     def print_actor_tile(self,actor,location,console):
@@ -231,27 +422,31 @@ class GameMap:
         bg = None
         string = actor.char
         x,y = location
+        engine = self.engine
 
         if self.visible[actor.x,actor.y]:
             if actor.is_phased_out:
                 bg = color.purple
                 fg = color.purple
-            elif actor.ai.fov[self.engine.player.x,self.engine.player.y] and actor.name != "Decoy":
+            elif actor.ai.fov[engine.player.x,engine.player.y] and actor.name != "Decoy":
                 bg = None
                 if actor.is_constricted:
                     fg = color.black
                     bg = color.grey
 
-        elif self.smellable(actor, True):
-            bg=None
-
-        elif self.smellable(actor):
-            string = '?'
-            fg = color.yellow
-            bg = None
-
         else:
-            return False
+            # same tests as smellable, measuring the distance once
+            distance = self.player_distance(actor)
+            if distance <= engine.foi_radius:
+                bg=None
+
+            elif distance <= engine.fos_radius:
+                string = '?'
+                fg = color.yellow
+                bg = None
+
+            else:
+                return False
 
         console.print(x=x,y=y,string=string,fg=fg,bg=bg)
         return True
@@ -260,10 +455,10 @@ class GameMap:
         fg = item.color
         x,y = location
 
-        if item in self.engine.player.inventory.items or item is self.engine.player:
-            if not self.tiles['snakeable'][item.x,item.y]:
+        if item in self.engine.player.inventory or item is self.engine.player:
+            if not self.snakeable_tiles[item.x,item.y]:
                 fg = color.purple
-            elif not self.tiles['walkable'][item.x,item.y]:
+            elif not self.walkable_tiles[item.x,item.y]:
                 fg = (50,150,255)
             elif self.engine.player.is_shielded or self.engine.player.is_petrified:
                 fg = color.grey
@@ -298,33 +493,41 @@ class GameMap:
         If it isn't, but it's in the "explored" array, then draw it with the "dark" colors.
         Otherwise, the default is "SHROUD".
         """
-        console.tiles_rgb[0 : self.width, 0 : self.height] = np.select(
-            condlist=[self.visible, self.explored, self.mapped],
-            choicelist=[self.tiles["light"], self.tiles["dark"], tile_types.MAPPED],
-            default=tile_types.SHROUD,
-            #default=self.tiles["dark"]
-        )
-
-        entities_sorted_for_rendering = sorted(
-            self.entities, key=lambda x: x.render_order.value
-        )
-
-        for entity in entities_sorted_for_rendering:
-            self.print_intent(console, entity)          
+        # paint lowest priority first, straight into the console
+        tiles_rgb = console.tiles_rgb[0 : self.width, 0 : self.height]
+        tiles_rgb[...] = tile_types.SHROUD
+        tiles_rgb[self.mapped] = tile_types.MAPPED
+        np.copyto(tiles_rgb, self.tiles["dark"], where=self.explored, casting="unsafe")
+        np.copyto(tiles_rgb, self.tiles["light"], where=self.visible, casting="unsafe")
+
+        if self.render_sorted is None:
+            self.render_sorted = sorted(self.entities, key=render_order_key)
+        entities_sorted_for_rendering = self.render_sorted
+
+        player = self.engine.player
+        inventory = player.inventory
+
+        # intents go down before any tiles so that entities draw over arrows,
+        # which keeps this a separate pass; only living actors have intents
+        # and blindness hides them all
+        if ThirdEyeBlind not in player.status_map:
+            player_xys = self.player_xys()
+            for actor in self.actors:
+                self.print_intent(console, actor, player_xys=player_xys)
 
         # display entities
         for entity in entities_sorted_for_rendering:
-            if isinstance(entity,Actor) and entity is not self.engine.player:
+            if isinstance(entity,Actor) and entity is not player:
                 self.print_actor_tile(entity,entity.xy,console)
-            elif entity is self.engine.player or entity in self.engine.player.inventory.items:
+            elif entity is player or entity in inventory:
                 continue
             else:
                 self.print_item_tile(entity,entity.xy,console) # player counts as an item
 
-        for i in reversed(self.engine.player.inventory.items): # print in reverse order for stair reasons
+        for i in reversed(inventory.items): # print in reverse order for stair reasons
             self.print_item_tile(i,i.xy,console)
 
-        self.print_item_tile(self.engine.player,self.engine.player.xy,console)
+        self.print_item_tile(player,player.xy,console)
 
 
 class GameWorld:
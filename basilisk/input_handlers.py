@@ -6,7 +6,6 @@ from typing import Callable, Optional, Tuple, TYPE_CHECKING, Union
 
 import tcod.event
 import math
-import glob
 
 from basilisk import actions, color, exceptions
 from basilisk.actions import (
@@ -92,6 +91,8 @@ WAIT_KEYS = {
     tcod.event.K_CLEAR,
 }
 
+VOWELS = frozenset('aeiouy')
+
 CONFIRM_KEYS = {
     tcod.event.K_RETURN,
     tcod.event.K_KP_ENTER,
@@ -118,6 +119,20 @@ CURSOR_X_KEYS = {
     tcod.event.K_KP_6: 1
 }
 
+# MainGameEventHandler's remaining keys; each entry takes the handler and returns its result
+MAIN_GAME_KEYS = {
+    tcod.event.K_ESCAPE: lambda handler: PlayMenuHandler(handler.engine, handler),
+    tcod.event.K_v: lambda handler: HistoryViewer(handler.engine),
+    tcod.event.K_i: lambda handler: InventorySelectHandler(handler.engine),
+    tcod.event.K_s: lambda handler: InventorySpitHandler(handler.engine),
+    tcod.event.K_d: lambda handler: InventoryDigestHandler(handler.engine),
+    tcod.event.K_x: lambda handler: LookHandler(handler.engine),
+    tcod.event.K_TAB: lambda handler: LookHandler(handler.engine,True),
+    tcod.event.K_c: lambda handler: handler.toggle_instructions(),
+    tcod.event.K_o: lambda handler: DictionaryEventHandler(handler.engine),
+    tcod.event.K_p: lambda handler: CompendiumHandler(handler.engine),
+}
+
 
 ActionOrHandler = Union[Action, "BaseEventHandler"]
 """An event handler return value which can trigger an action or switch active handlers.
@@ -168,7 +183,7 @@ class EventHandler(BaseEventHandler):
                 return ConfirmCombatHandler(self.engine)
             if not self.engine.in_combat and self.engine.confirmed_in_combat:
                 self.engine.confirmed_in_combat = False
-            return MainGameEventHandler(self.engine)  # Return to the main handler.
+            return MainGameEventHandler.get(self.engine)  # Return to the main handler.
         return self
 
     def handle_action(self, action: Optional[Action]) -> bool:
@@ -188,7 +203,7 @@ class EventHandler(BaseEventHandler):
             return OrderPickupHandler(self.engine)
 
         else:
-            while any(isinstance(s, PetrifiedSnake) for s in self.engine.player.statuses) and self.engine.player.is_alive:
+            while PetrifiedSnake in self.engine.player.status_map and self.engine.player.is_alive:
                 self.engine.animation_beat()
                 self.engine.handle_enemy_turns()
 
@@ -244,12 +259,25 @@ class EventHandler(BaseEventHandler):
 
 
 class MainGameEventHandler(EventHandler):
+    @classmethod
+    def get(cls, engine: Engine) -> MainGameEventHandler:
+        """Return the main handler for engine, reused from turn to turn."""
+        handler = getattr(engine, "main_handler", None)
+        if handler is None:
+            handler = engine.main_handler = cls(engine)
+        else:
+            engine.mouse_location = 0,0  # as a fresh handler would
+        return handler
+
     def handle_events(self, event):
-        te = self.engine.meta.tutorial_events
+        meta = self.engine.meta
 
-        if not self.engine.meta.tutorials or len(te) >= 13:
+        # all thirteen tutorials seen (or switched off) is the usual case, so settle it first
+        if not meta.tutorials or len(meta.tutorial_events) >= 13:
             return super().handle_events(event)
 
+        te = set(meta.tutorial_events)
+
         if not "new game" in te:
             return TutorialConfirm(self.engine, "new game")
         if not "pick up" in te and len(self.engine.player.inventory.items) > 0:
@@ -264,7 +292,7 @@ class MainGameEventHandler(EventHandler):
             return TutorialConfirm(self.engine, "enemy")
         if not "constrict" in te and self.engine.an_enemy_is_constricted:
             return TutorialConfirm(self.engine, "constrict")
-        if not "consonant" in te and any(i.char not in ['a','e','i','o','u','y'] for i in self.engine.player.inventory.items):
+        if not "consonant" in te and any(i.char not in VOWELS for i in self.engine.player.inventory.items):
             return TutorialConfirm(self.engine, "consonant")
         if not "stairs" in te and self.engine.stairs_visible:
             return TutorialConfirm(self.engine, "stairs")
@@ -316,36 +344,15 @@ class MainGameEventHandler(EventHandler):
                 return Confirm(self, lambda: WaitAction(player), "Wait while enemies intend to attack?", None, self.engine)
             else:
                 action = WaitAction(player)
-        elif key == tcod.event.K_ESCAPE:
-            return PlayMenuHandler(self.engine, self)
-        elif key == tcod.event.K_v:
-            return HistoryViewer(self.engine)
-
-        elif key == tcod.event.K_i:
-            return InventorySelectHandler(self.engine)
-        elif key == tcod.event.K_s:
-            return InventorySpitHandler(self.engine)
-        elif key == tcod.event.K_d:
-            return InventoryDigestHandler(self.engine)
-
-        elif key == tcod.event.K_x:
-            return LookHandler(self.engine)
-
-        elif key == tcod.event.K_TAB:
-            return LookHandler(self.engine,True)
-
-        elif key == tcod.event.K_c:
-            self.engine.show_instructions = not self.engine.show_instructions
-
-        elif key == tcod.event.K_o:
-            return DictionaryEventHandler(self.engine)
-
-        elif key == tcod.event.K_p:
-            return CompendiumHandler(self.engine)
+        elif key in MAIN_GAME_KEYS:
+            return MAIN_GAME_KEYS[key](self)
 
         # No valid key was pressed
         return action
 
+    def toggle_instructions(self) -> None:
+        self.engine.show_instructions = not self.engine.show_instructions
+
     # hopefully this helps with int'l keyboards not registering shift+/ or shift+.
     # upgrading tcod will also fix
     def ev_textinput(self, event: tcod.event.TextInput):
@@ -386,7 +393,7 @@ class AskUserEventHandler(EventHandler):
 
         By default this returns to the main event handler.
         """
-        return MainGameEventHandler(self.engine)
+        return MainGameEventHandler.get(self.engine)
 
     def print_multicolor_box(self, console, x, y, width, height, parts, override_color=None):
         """For highlighting stat-affected numbers"""
@@ -524,7 +531,7 @@ class TutorialConfirm(EventHandler):
     def ev_keydown(self,event):
         if event.sym == tcod.event.K_SPACE:
             self.engine.confirmed_in_combat = True
-            return MainGameEventHandler(self.engine)
+            return MainGameEventHandler.get(self.engine)
 
 
 class ConfirmCombatHandler(EventHandler):
@@ -537,7 +544,7 @@ class ConfirmCombatHandler(EventHandler):
     def ev_keydown(self,event):
         if event.sym == tcod.event.K_SPACE:
             self.engine.confirmed_in_combat = True
-            return MainGameEventHandler(self.engine)
+            return MainGameEventHandler.get(self.engine)
 
 
 class GameOverEventHandler(EventHandler):
@@ -545,9 +552,8 @@ class GameOverEventHandler(EventHandler):
         super().__init__(engine)
         if os.path.exists(utils.get_resource("savegame.sav")):
             os.remove(utils.get_resource("savegame.sav"))  # Deletes the active save file.
-        snapshots = glob.glob(utils.get_resource("snapshot_*.sav"))
-        for s in snapshots:
-            os.remove(s)
+        utils.flush_snapshots()  # surface any failed write before the snapshots go
+        utils.clear_snapshots()
 
         event = 'lose' if loss else 'win'
         self.engine.history.append((event,self.engine.player.cause_of_death,self.engine.turn_count))
@@ -611,10 +617,15 @@ class GameOverStatScreen(EventHandler):
         raise exceptions.QuitWithoutSaving()
 
     def on_render(self,console):
-        history = self.engine.history
-        words = [i[1] for i in history if i[0] == 'form word']
-        uses = [i for i in history if i[0] in ['spit item','digest item']]
-        kills = [i for i in history if i[0] == 'kill enemy']
+        words = []
+        uses = kills = 0
+        for event in self.engine.history:
+            if event[0] == 'form word':
+                words.append(event[1])
+            elif event[0] in ('spit item','digest item'):
+                uses += 1
+            elif event[0] == 'kill enemy':
+                kills += 1
         pname = words[-1] if words else ''
 
         if not self.engine.player.is_alive:
@@ -632,17 +643,16 @@ class GameOverStatScreen(EventHandler):
             console.print(1,3,f"Constricted the One Below!",color.purple)
         
         console.print(1,5,"Along the way:",color.offwhite)
-        console.print(3,6,f"- Used {len(uses)} items",color.offwhite)
-        console.print(3,7,f"- Killed {len(kills)} foes",color.offwhite)
+        console.print(3,6,f"- Used {uses} items",color.offwhite)
+        console.print(3,7,f"- Killed {kills} foes",color.offwhite)
         console.print(3,8,f"- Formed {len(set(words))} words",color.offwhite)
 
-        lword = sorted(words,key=lambda x:len(x))[-1] if words else "n/a"
+        lword = max(reversed(words),key=len) if words else "n/a" # latest of the longest
         console.print(1,10,f"Longest word: {lword}")
         console.print(1,12,f"Turn count: {self.engine.turn_count}")
 
         y = 3
-        seen = set()
-        for w in [i for i in reversed(words) if not (i in seen or seen.add(i))]:
+        for w in dict.fromkeys(reversed(words)): # most recent first, without repeats
             console.print(52,y,f"@{w}",tuple(c//2 for c in color.player))
             y += 1
             if y > 39:
@@ -698,7 +708,7 @@ class HistoryViewer(EventHandler):
         elif event.sym == tcod.event.K_END:
             self.cursor = self.log_length - 1  # Move directly to the last message.
         else:  # Any other key moves back to the main game state.
-            return MainGameEventHandler(self.engine)
+            return MainGameEventHandler.get(self.engine)
         return None
 
 
@@ -769,7 +779,7 @@ class InventoryEventHandler(AskUserEventHandler):
             self.connect_to_player_panel = False
         self.inventory_length = len(self.items)
         self.cursor = 0
-        self.frame_width = max(len(i) for i in (self.TITLE, range(31), self.tooltip) if i is not None)+4
+        self.frame_width = max(len(self.TITLE or ''), 31, len(self.tooltip or ''))+4
         self.last_y = 36-self.frame_height
         self.frame_x = 71-self.frame_width if engine.player.x < 71-self.frame_width or engine.player.y < self.last_y else 0
 
@@ -1368,7 +1378,7 @@ class OrderPickupHandler(InventoryRearrangeHandler):
     def __init__(self,engine):
         super().__init__(engine,None)
         self.selected_items = engine.player.inventory.items[:]
-        self.items = [i for i in self.engine.game_map.items if i.xy == engine.player.xy and not i in engine.player.inventory.items]
+        self.items = [i for i in self.engine.game_map.items if i.xy == engine.player.xy and not i in engine.player.inventory]
         self.inventory_length = len(self.items)
 
     def on_exit(self):
@@ -1377,14 +1387,14 @@ class OrderPickupHandler(InventoryRearrangeHandler):
     def on_final_item_selected(self):
         items = []
         for i in self.selected_items:
-            if i in self.engine.player.inventory.items:
+            if i in self.engine.player.inventory:
                 continue
             if len(self.engine.player.inventory.items) + len(items) >= 26:
                 self.engine.message_log.add_message("Inventory full.",color.grey)
                 break
             items.append(i)
         if not items:
-            return MainGameEventHandler(self.engine)
+            return MainGameEventHandler.get(self.engine)
         return actions.PickupAction(self.engine.player, items)
 
 
@@ -1451,7 +1461,7 @@ class LookHandler(SelectIndexHandler):
 
     def on_index_selected(self, x: int, y: int) -> MainGameEventHandler:
         """Return to main handler."""
-        return MainGameEventHandler(self.engine)
+        return MainGameEventHandler.get(self.engine)
 
     def ev_keydown(self, event: tcod.event.KeyDown):
         key = event.sym
@@ -1854,7 +1864,7 @@ class InspectHandler(InventoryEventHandler):
 
     # via mouse
     def on_exit(self):
-        return MainGameEventHandler(self.engine)
+        return MainGameEventHandler.get(self.engine)
 
 
 
@@ -1,4 +1,5 @@
 from typing import Iterable, List, Reversible, Tuple
+import string
 import textwrap
 
 import tcod
@@ -6,13 +7,23 @@ import tcod
 from basilisk import color
 
 
+class MessageFormatter(string.Formatter):
+    """str.format, plus a !c conversion that capitalizes its field."""
+
+    def convert_field(self, value, conversion):
+        if conversion == "c":
+            return str(value).capitalize()
+        return super().convert_field(value, conversion)
+
+
+formatter = MessageFormatter()
+
+
 class Message:
-    def __init__(self, text: str, fg: Tuple[int, int, int], message_log, arg: str = None, arg_color: str = None):
-        if arg:
-            self.plain_text = arg.join(text.split('?'))
-        else:
-            self.plain_text = text
-        self.text = text
+    def __init__(self, text: str, fg: Tuple[int, int, int], message_log, arg: str = None, arg_color: str = None, fmt_args: tuple = ()):
+        self._text = text
+        self._plain_text = None
+        self.fmt_args = fmt_args
         self.fg = fg
         self.count = 1
         self.parent = message_log
@@ -20,6 +31,28 @@ class Message:
         self.arg = arg
         self.arg_color = arg_color
 
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        if "text" in state:
+            # saves from before lazy formatting store the finished strings
+            self._text = self.__dict__.pop("text")
+            self._plain_text = self.__dict__.pop("plain_text")
+            self.fmt_args = ()
+
+    @property
+    def text(self) -> str:
+        """The message template, formatted with its arguments on first use."""
+        if self.fmt_args:
+            self._text = formatter.format(self._text, *self.fmt_args)
+            self.fmt_args = ()
+        return self._text
+
+    @property
+    def plain_text(self) -> str:
+        if self._plain_text is None:
+            self._plain_text = self.arg.join(self.text.split('?')) if self.arg else self.text
+        return self._plain_text
+
     @property
     def full_text(self) -> str:
         """The full text of this message, including the count if necessary."""
@@ -39,15 +72,16 @@ class MessageLog:
         If `stack` is True then the message can stack with a previous message
         of the same text.
         """
-        if arg:
-            ftext = arg.join(text.split('?'))
-        else:
-            ftext = text
-
-        last_msg = self.messages[-1] if self.messages else None
-
         self.messages.append(Message(text, fg, self, arg, arg_color))
 
+    def add_lazy(
+        self, template: str, fg: Tuple[int, int, int] = color.offwhite, arg: str = None, arg_color: str = None, fmt_args: tuple = ()
+    ) -> None:
+        """Add a message whose `template` is only formatted with `fmt_args`
+        when the message is displayed. `{0!c}` capitalizes an argument.
+        """
+        self.messages.append(Message(template, fg, self, arg, arg_color, fmt_args))
+
     def render(
         self, console: tcod.Console, x: int, y: int, width: int, height: int,
     ) -> None:
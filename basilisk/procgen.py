@@ -322,13 +322,13 @@ class MazeCell():
 			return ["....x","....x","....x","....x","....x"]
 
 	def solidify(self,dungeon):
-		for y,row in enumerate(self.chunk):
-			for x,tile in enumerate(row):
-				cx = self.x*5 + x + self.maze.x_offset
-				cy = self.y*5 + y + self.maze.y_offset
-				floor_tile = tile_types.floor if not self.maze.boss_maze else tile_types.boss_vault_floor
-
-				dungeon.tiles[(cx,cy)] = tile_types.wall if tile == 'x' else tile_types.floor
+		cx = self.x*5 + self.maze.x_offset
+		cy = self.y*5 + self.maze.y_offset
+		# chunk rows run along y, so transpose into the map's [x,y] layout
+		walls = numpy.array([[tile == 'x' for tile in row] for row in self.chunk]).T
+		area = dungeon.tiles[cx:cx+walls.shape[0], cy:cy+walls.shape[1]]
+		area[...] = tile_types.floor
+		area[walls] = tile_types.wall
 
 	@property
 	def map_coords(self):
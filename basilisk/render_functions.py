@@ -17,6 +17,7 @@ if TYPE_CHECKING:
 
 DIRECTIONS = [(0,-1),(0,1),(-1,-1),(-1,0),(-1,1),(1,-1),(1,0),(1,1)]
 D_ARROWS = ['↑', '↓', '\\', '←', '/', '/','→','\\']
+DIRECTION_ARROWS = dict(zip(DIRECTIONS, D_ARROWS))
 D_KEYS = ['K','J','Y','H','B','U','L','N']
 ALPHA_CHARS = ['A','B','C','D','E','F','G','H','I','J','K','L','M','N','O','P','Q','R','S','T','U','V','W','X','Y','Z']
 
@@ -265,7 +266,7 @@ def render_player_drawer(console: Console, location: Tuple[int,int], player, tur
 def print_fov_actors(console,player,xy):
     x,y = xy
     chars = ALPHA_CHARS[:]
-    for actor in sorted(list(player.gamemap.actors),key=lambda a:a.id):
+    for actor in player.gamemap.actors:
         if actor is player:
             continue
         if not (player.gamemap.visible[actor.x,actor.y] or player.gamemap.smellable(actor,True)):
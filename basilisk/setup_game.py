@@ -204,7 +204,7 @@ class MainMenu(input_handlers.BaseEventHandler):
             raise SystemExit()
         elif event.sym == tcod.event.K_c:
             if self.engine:
-                return input_handlers.MainGameEventHandler(self.engine)
+                return input_handlers.MainGameEventHandler.get(self.engine)
             else:
                 return input_handlers.PopupMessage(self, "No saved game to load.")
         elif event.sym == tcod.event.K_n:
@@ -219,7 +219,7 @@ class MainMenu(input_handlers.BaseEventHandler):
         return None
 
     def start_new_game(self):
-        return input_handlers.MainGameEventHandler(new_game(self.meta,self.terminal,self.console))
+        return input_handlers.MainGameEventHandler.get(new_game(self.meta,self.terminal,self.console))
 
 
 class SubMenu(input_handlers.BaseEventHandler):
@@ -509,6 +509,6 @@ class Meta():
         self.save()
 
     def save(self):
-        save_data = lzma.compress(pickle.dumps(self))
+        save_data = lzma.compress(pickle.dumps(self, pickle.HIGHEST_PROTOCOL), preset=1)
         with open(utils.get_resource("savemeta.sav"), "wb") as f:
             f.write(save_data)
@@ -1,6 +1,9 @@
 import sys
 import os
 import glob
+import lzma
+import pickle
+from concurrent.futures import ThreadPoolExecutor
 
 is_frozen = getattr(sys, 'frozen', False)
 frozen_temp_path = getattr(sys, '_MEIPASS', '')
@@ -22,4 +25,45 @@ def del_old_snapshots(turn_count):
 	for s in snapshots:
 		turn = s[len(path):s.rindex('.')]
 		if int(turn) < turn_count - 20:
-			os.remove(s)
\ No newline at end of file
+			os.remove(s)
+
+# turn snapshots are written and read back on one background thread, so
+# work runs in submission order: a load never overtakes a pending write
+snapshot_worker = ThreadPoolExecutor(max_workers=1)
+pending_snapshot = None
+LZMA_MAGIC = b"\xfd7zXZ"  # .xz header, as written by lzma.compress
+
+def write_snapshot(turn_count, data):
+	with open(get_resource(f"snapshot_{turn_count}.sav"), "wb") as f:
+		f.write(data)
+	del_old_snapshots(turn_count)
+
+def queue_snapshot(turn_count, data):
+	global pending_snapshot
+	pending_snapshot = snapshot_worker.submit(write_snapshot, turn_count, data)
+
+def load_snapshot(turn_count):
+	with open(get_resource(f"snapshot_{turn_count}.sav"), "rb") as f:
+		data = f.read()
+	if data.startswith(LZMA_MAGIC):
+		# left on disk by a build that still compressed its snapshots
+		data = lzma.decompress(data)
+	return pickle.loads(data)
+
+def prefetch_snapshots(turn_counts):
+	"""Start loading snapshots in the background; returns futures in the same order."""
+	return [snapshot_worker.submit(load_snapshot, turn_count) for turn_count in turn_counts]
+
+def delete_snapshots():
+	for s in glob.glob(get_resource("snapshot_*.sav")):
+		os.remove(s)
+
+def clear_snapshots():
+	"""Delete every snapshot in the background, after any queued writes."""
+	global pending_snapshot
+	pending_snapshot = snapshot_worker.submit(delete_snapshots)
+
+def flush_snapshots():
+	"""Block until every queued snapshot is on disk, re-raising any write error."""
+	if pending_snapshot:
+		pending_snapshot.result()
\ No newline at end of file